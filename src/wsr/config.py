@@ -5,11 +5,21 @@ Priority: CLI > wsr.yaml > hardcoded defaults.
 """
 from __future__ import annotations
 
+import functools
 import os
 import re
 import logging
+from types import MappingProxyType
 from typing import Callable, Optional, Union
 
+import yaml
+
+try:
+    # libyaml-backed loader, 5-10x faster than the pure-Python one
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 logger = logging.getLogger(__name__)
 
 # Strict pattern for language codes – only lowercase ASCII, exactly 2 chars.
@@ -38,6 +48,8 @@ _CONFIG_SCHEMA: dict[str, tuple[type | tuple[type, ...], Optional[Callable], str
         lambda v: 0.1 <= v <= 1.0,
         "must be a number between 0.1 and 1.0",
     ),
+    "quantize": (bool, None, "must be true or false"),
+    "inline_images": (bool, None, "must be true or false"),
     "cursor": (str, None, "must be a string"),
     "debug": (bool, None, "must be true or false"),
     "capture_window_only": (bool, None, "must be true or false"),
@@ -62,6 +74,8 @@ out: "output.html"
 style: "~/.config/wsr/style.css"
 image_format: "webp"
 image_quality: 0.8
+quantize: false
+inline_images: true
 cursor: "system"
 debug: false
 capture_window_only: false
@@ -72,9 +86,35 @@ key_interval: 500
 lang: null
 """
 
+# Hardcoded defaults (lowest priority). Read-only: values are immutable, so
+# a shallow dict() copy is all a caller needs.
+_DEFAULT_CONFIG = MappingProxyType({
+    "location": "~/Pictures/wsr/",
+    "filename_format": "report-{%datetime}.html",
+    "out": "output.html",
+    "style": "~/.config/wsr/style.css",
+    "image_format": "webp",
+    "image_quality": 0.8,
+    "quantize": False,
+    "inline_images": True,
+    "cursor": "system",
+    "debug": False,
+    "capture_window_only": False,
+    "verbose": False,
+    "countdown": 3,
+    "no_keys": False,
+    "key_interval": 500,
+    "lang": None,
+})
+
 # Keys whose values are paths to expand with expanduser
 _PATH_KEYS = frozenset({"location", "style", "cursor", "out"})
 
+# Last loaded config (or the defaults fallback for an unparsable file),
+# reused while wsr.yaml is unchanged ("stamp" is (st_mtime_ns, st_size) of
+# the file it was read from)
+_CONFIG_CACHE = {"path": None, "stamp": None, "data": None}
+
 
 def validate_config(config: dict) -> list[str]:
     """
@@ -126,22 +166,7 @@ def get_default_config():
     """
     Return hardcoded default config as a dict (single source of truth for lowest priority).
     """
-    return {
-        "location": "~/Pictures/wsr/",
-        "filename_format": "report-{%datetime}.html",
-        "out": "output.html",
-        "style": "~/.config/wsr/style.css",
-        "image_format": "webp",
-        "image_quality": 0.8,
-        "cursor": "system",
-        "debug": False,
-        "capture_window_only": False,
-        "verbose": False,
-        "countdown": 3,
-        "no_keys": False,
-        "key_interval": 500,
-        "lang": None,
-    }
+    return dict(_DEFAULT_CONFIG)
 
 
 def _expand_paths(config):
@@ -156,6 +181,7 @@ def _expand_paths(config):
 def ensure_config_file():
     """
     If wsr.yaml does not exist, create config dir and write default wsr.yaml.
+    load_config() only calls this after its stat of the file failed.
     """
     path = get_config_path()
     if os.path.isfile(path):
@@ -174,25 +200,43 @@ def load_config():
     """
     Load config: defaults + wsr.yaml (if present). Path values are expanded.
     If wsr.yaml does not exist, it is created with default content, then defaults are returned.
+    The result (including the fallback for an unparsable file) is cached and
+    reused until the file's mtime or size changes.
     """
-    import yaml
-
-    defaults = get_default_config()
+    defaults = _DEFAULT_CONFIG
     path = get_config_path()
 
-    if not os.path.isfile(path):
+    try:
+        st = os.stat(path)
+    except OSError:
         ensure_config_file()
         return _expand_paths(defaults)
 
+    if st.st_size == 0:
+        # Emptied (e.g. truncated or touched) file: nothing to parse
+        return _expand_paths(defaults)
+
+    # Size catches edits within one mtime tick on coarse-timestamp filesystems
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _CONFIG_CACHE["path"] == path and _CONFIG_CACHE["stamp"] == stamp:
+        return dict(_CONFIG_CACHE["data"])
+
     try:
         with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-    except (OSError, yaml.YAMLError) as e:
+            data = yaml.load(f, Loader=_SafeLoader)
+    except OSError as e:
         logger.warning("Could not load config from %s: %s. Using defaults.", path, e)
         return _expand_paths(defaults)
+    except yaml.YAMLError as e:
+        logger.warning("Could not load config from %s: %s. Using defaults.", path, e)
+        data = None
 
     if not isinstance(data, dict):
-        return _expand_paths(defaults)
+        # Broken or non-mapping file: cache the fallback too, so an unchanged
+        # file is not parsed (and warned about) again
+        result = _expand_paths(defaults)
+        _CONFIG_CACHE.update(path=path, stamp=stamp, data=result)
+        return dict(result)
 
     # Merge: user file over defaults (only known keys)
     merged = dict(defaults)
@@ -209,7 +253,17 @@ def load_config():
             f"Fix the config file or delete it to reset to defaults."
         )
 
-    return _expand_paths(merged)
+    result = _expand_paths(merged)
+    _CONFIG_CACHE.update(path=path, stamp=stamp, data=result)
+    return dict(result)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_increment_pattern(filename_pattern):
+    """Compile a regex matching filename_pattern with {%n} captured as digits."""
+    # Escape regex special chars except our placeholder
+    escaped = re.escape(filename_pattern).replace(r"\{%n\}", r"(\d+)")
+    return re.compile("^" + escaped + "$")
 
 
 def _resolve_increment(location, filename_pattern):
@@ -217,20 +271,20 @@ def _resolve_increment(location, filename_pattern):
     Find next available number for {%n} placeholder.
     Scans location directory for existing files matching the pattern.
     """
-    import re
-    # Escape regex special chars except our placeholder
-    escaped = re.escape(filename_pattern).replace(r"\{%n\}", r"(\d+)")
-    regex = re.compile("^" + escaped + "$")
+    regex = _compile_increment_pattern(filename_pattern)
 
     loc = os.path.expanduser(location)
     if not os.path.isdir(loc):
         return filename_pattern.replace("{%n}", "1")
 
     max_n = 0
-    for f in os.listdir(loc):
-        match = regex.match(f)
-        if match:
-            max_n = max(max_n, int(match.group(1)))
+    with os.scandir(loc) as it:
+        for entry in it:
+            match = regex.match(entry.name)
+            if match:
+                n = int(match.group(1))
+                if n > max_n:
+                    max_n = n
 
     return filename_pattern.replace("{%n}", str(max_n + 1))
 
@@ -9,6 +9,28 @@ logger = logging.getLogger(__name__)
 # Strict pattern for language codes – only lowercase ASCII, exactly 2 chars.
 _LANG_RE = re.compile(r"^[a-z]{2}$")
 
+# Parsed locale files per language, shared by all I18n instances so that
+# repeated init_i18n() calls don't re-read and re-parse the JSON.
+_LANG_CACHE: dict[str, dict] = {}
+
+
+def _read_locale(lang):
+    """
+    Reads locales/<lang>.json.
+
+    Returns:
+        dict, or None if there is no file for lang.
+    """
+    path = os.path.join(os.path.dirname(__file__), "locales", f"{lang}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error("Could not load translations: %s", e)
+        return {}
+
 
 class I18n:
     """
@@ -34,32 +56,45 @@ class I18n:
         return 'en'
 
     def _load_translations(self):
-        """Loads the JSON file for the current language."""
-        base_dir = os.path.dirname(__file__)
-        path = os.path.join(base_dir, "locales", f"{self.lang}.json")
-        
-        # Fallback to English if file not found
-        if not os.path.exists(path):
-            path = os.path.join(base_dir, "locales", "en.json")
+        """
+        Loads the table for the current language.
+
+        Non-English tables are flattened onto the English one at load time,
+        so a key missing in a translation shows the English text instead of
+        the raw key, and translate() stays a single dict lookup.
+        """
+        if self.lang in _LANG_CACHE:
+            self.translations = _LANG_CACHE[self.lang]
+            return
+
+        table = _read_locale(self.lang)
+        if table is None:
+            # Fallback to English if file not found
             self.lang = 'en'
+            if self.lang in _LANG_CACHE:
+                self.translations = _LANG_CACHE[self.lang]
+                return
+            table = _read_locale('en') or {}
+        elif self.lang != 'en':
+            table = {**(_read_locale('en') or {}), **table}
 
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
-        except Exception as e:
-            logger.error(f"Could not load translations: {e}")
-            self.translations = {}
+        self.translations = table
+        _LANG_CACHE[self.lang] = table
 
     def translate(self, msg_key, **kwargs):
         """Translates a key and formats it with kwargs."""
         text = self.translations.get(msg_key, msg_key)
         if kwargs:
             try:
-                return text.format(**kwargs)
+                return text.format_map(kwargs)
             except KeyError:
                 return text
         return text
 
+    def raw(self, msg_key):
+        """Returns the unformatted template for a key (for hot loops)."""
+        return self.translations.get(msg_key, msg_key)
+
 # Global instance for easy use
 _instance = None
 
@@ -70,4 +105,10 @@ def init_i18n(lang=None):
 def _(msg_key, **kwargs):
     if _instance is None:
         init_i18n()
-    return _instance.translate(msg_key, **kwargs)
\ No newline at end of file
+    return _instance.translate(msg_key, **kwargs)
+
+
+def raw(msg_key):
+    if _instance is None:
+        init_i18n()
+    return _instance.raw(msg_key)
@@ -1,12 +1,104 @@
 import logging
+import math
+import os
 import threading
 import select
+import struct
 import time
-import queue
+from collections import deque
 import evdev
 
 logger = logging.getLogger(__name__)
 
+# Capacity of the event ring buffer. On overflow the oldest events are dropped.
+EVENT_QUEUE_SIZE = 4096
+
+# Device classification cache: path -> (st_mtime_ns, probed_at, is_mouse, is_keyboard).
+# Re-probing capabilities is a full ioctl sweep per node, so verdicts are
+# reused while the device node is unchanged and the entry is younger than the TTL.
+_CAPS_CACHE = {}
+_CAPS_CACHE_TTL = 30.0
+
+# sysfs mirror of the evdev nodes; capability bitmasks there can be read
+# without opening the device.
+_SYSFS_INPUT = "/sys/class/input"
+_LONG_BITS = struct.calcsize("l") * 8
+
+# Kernel struct input_event: struct timeval, __u16 type, __u16 code, __s32 value.
+# Reading the device fd directly skips evdev's per-event InputEvent objects.
+_INPUT_EVENT = struct.Struct("llHHi")
+_READ_SIZE = _INPUT_EVENT.size * 64
+
+
+def _name_map(codes):
+    """Flattens an ecodes mapping to code -> name (first alias wins)."""
+    return {c: (n if isinstance(n, str) else n[0]) for c, n in codes.items()}
+
+
+# Event type constants, bound once so hot paths avoid repeated attribute loads
+_EV_KEY = evdev.ecodes.EV_KEY
+_EV_REL = evdev.ecodes.EV_REL
+_KEY_A = evdev.ecodes.KEY_A
+
+# Plain-dict name lookups, built once at import instead of per event.
+# evdev maps aliased codes to tuples, e.g. BTN_LEFT -> ('BTN_LEFT', 'BTN_MOUSE').
+_KEY_NAMES = _name_map(evdev.ecodes.KEY)
+_BTN_NAMES = _name_map(evdev.ecodes.BTN)
+_MOUSE_BTNS = frozenset({
+    evdev.ecodes.BTN_LEFT,
+    evdev.ecodes.BTN_RIGHT,
+    evdev.ecodes.BTN_MIDDLE,
+})
+
+
+def _read_caps_bitmask(ev_name, kind):
+    """
+    Reads a capability bitmask from sysfs.
+
+    The kernel prints the mask as space-separated hex longs, most
+    significant word first.
+
+    Returns:
+        int or None: The bitmask, or None if it cannot be read.
+    """
+    path = os.path.join(_SYSFS_INPUT, ev_name, "device", "capabilities", kind)
+    try:
+        with open(path, "r") as f:
+            words = f.read().split()
+    except OSError:
+        return None
+    mask = 0
+    try:
+        for word in words:
+            mask = (mask << _LONG_BITS) | int(word, 16)
+    except ValueError:
+        return None
+    return mask
+
+
+def _sysfs_classify(path):
+    """
+    Classifies a device node from sysfs without opening it.
+
+    Args:
+        path: Device node path, e.g. /dev/input/event3.
+
+    Returns:
+        tuple or None: (is_mouse, is_keyboard), or None if sysfs is unavailable.
+    """
+    ev_name = os.path.basename(path)
+    ev = _read_caps_bitmask(ev_name, "ev")
+    if ev is None:
+        return None
+    is_mouse = bool(ev & (1 << _EV_REL))
+    is_keyboard = False
+    if ev & (1 << _EV_KEY):
+        keys = _read_caps_bitmask(ev_name, "key")
+        if keys is None:
+            return None
+        is_keyboard = bool(keys & (1 << _KEY_A))
+    return is_mouse, is_keyboard
+
 
 class InputManager:
     """
@@ -19,6 +111,12 @@ class InputManager:
         # stop() called automatically
     """
 
+    __slots__ = (
+        "devices", "mouse_devices", "keyboard_devices", "running", "thread",
+        "event_queue", "log_keys", "cursor_position_fn",
+        "_wake_pipe", "_wake_poll", "_log_info", "_epoll", "_fd_map", "_stop_pipe",
+    )
+
     def __init__(self, cursor_position_fn=None):
         """
         Initializes the InputManager with default settings.
@@ -32,9 +130,19 @@ class InputManager:
         self.keyboard_devices = []
         self.running = False
         self.thread = None
-        self.event_queue = queue.Queue()
+        self._epoll = None
+        self._fd_map = {}
+        self._stop_pipe = None
+        # Single producer (_loop) / single consumer (main): deque.append and
+        # deque.popleft are atomic, so no lock is needed on the hot path.
+        self.event_queue = deque(maxlen=EVENT_QUEUE_SIZE)
+        # Consumer wake-up pipe, opened by start() (see _open_wake_pipe)
+        self._wake_pipe = None
+        self._wake_poll = None
         self.log_keys = True
         self.cursor_position_fn = cursor_position_fn
+        # Cached so the event handler can skip building log messages
+        self._log_info = logger.isEnabledFor(logging.INFO)
 
     def __enter__(self):
         """Context manager entry - returns self, does NOT auto-start."""
@@ -62,45 +170,76 @@ class InputManager:
             )
             return
 
+        now = time.monotonic()
         for path in path_list:
             try:
-                dev = evdev.InputDevice(path)
-                caps = dev.capabilities()
-
-                is_mouse = False
-                is_keyboard = False
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    mtime = None
 
-                if evdev.ecodes.EV_REL in caps:
-                    is_mouse = True
+                cached = _CAPS_CACHE.get(path)
+                if (cached is not None and mtime is not None and cached[0] == mtime
+                        and now - cached[1] < _CAPS_CACHE_TTL):
+                    is_mouse, is_keyboard = cached[2], cached[3]
+                    if not (is_mouse or is_keyboard):
+                        continue
+                    dev = evdev.InputDevice(path)
+                else:
+                    # Skip nodes sysfs already rules out (power buttons,
+                    # lid switches, ...) without an open + ioctl sweep
+                    verdict = _sysfs_classify(path)
+                    if verdict == (False, False):
+                        if mtime is not None:
+                            _CAPS_CACHE[path] = (mtime, now, False, False)
+                        continue
+                    dev = evdev.InputDevice(path)
+                    is_mouse, is_keyboard = self._classify(dev.capabilities())
+                    if mtime is not None:
+                        _CAPS_CACHE[path] = (mtime, now, is_mouse, is_keyboard)
+                    if not (is_mouse or is_keyboard):
+                        dev.close()
+                        continue
 
-                if evdev.ecodes.EV_KEY in caps:
-                    # Check for KEY_A to identify real keyboards
-                    if evdev.ecodes.KEY_A in caps[evdev.ecodes.EV_KEY]:
-                        is_keyboard = True
+                # Each opened node reaches this point once, so no membership
+                # check is needed to keep self.devices free of duplicates
+                self.devices.append(dev)
 
                 if is_mouse:
                     self.mouse_devices.append(dev)
-                    self.devices.append(dev)
-                    logger.debug(f"Maus gefunden: {dev.name} ({dev.path})")
+                    logger.debug("Maus gefunden: %s (%s)", dev.name, dev.path)
 
                 if is_keyboard:
                     self.keyboard_devices.append(dev)
-                    if dev not in self.devices:
-                        self.devices.append(dev)
-                    logger.debug(f"Tastatur gefunden: {dev.name} ({dev.path})")
+                    logger.debug("Tastatur gefunden: %s (%s)", dev.name, dev.path)
 
             except (PermissionError, OSError) as e:
-                logger.warning(f"Konnte Gerät {path} nicht öffnen: {e}")
+                logger.warning("Konnte Gerät %s nicht öffnen: %s", path, e)
 
         logger.info(
-            f"Geräte gefunden: {len(self.mouse_devices)} Mäuse, "
-            f"{len(self.keyboard_devices)} Tastaturen."
+            "Geräte gefunden: %d Mäuse, %d Tastaturen.",
+            len(self.mouse_devices), len(self.keyboard_devices),
         )
 
+    @staticmethod
+    def _classify(caps):
+        """
+        Classifies a device from its capabilities.
+
+        Returns:
+            tuple: (is_mouse, is_keyboard)
+        """
+        is_mouse = _EV_REL in caps
+        # Check for KEY_A to identify real keyboards
+        is_keyboard = _KEY_A in caps.get(_EV_KEY, ())
+        return is_mouse, is_keyboard
+
     def start(self):
         """
         Starts the input listening thread.
         """
+        self._open_wake_pipe()
+
         if not self.devices:
             self.find_devices()
 
@@ -108,19 +247,99 @@ class InputManager:
             logger.error("Keine Eingabegeräte gefunden. Abbruch.")
             return
 
+        self._log_info = logger.isEnabledFor(logging.INFO)
+        self._open_poller()
+
         self.running = True
         self.thread = threading.Thread(target=self._loop, daemon=True)
         self.thread.start()
         logger.info("Input Listener gestartet.")
 
+    def _open_wake_pipe(self):
+        """
+        Opens the consumer wake-up pipe unless it is already open.
+
+        A self-pipe rather than a threading.Event: writing to it takes no
+        Python-level lock, so wake() is safe to call from a signal handler
+        running on the consumer thread.
+        """
+        if self._wake_pipe is not None:
+            return
+        self._wake_pipe = os.pipe()
+        for fd in self._wake_pipe:
+            os.set_blocking(fd, False)
+        self._wake_poll = select.poll()
+        self._wake_poll.register(self._wake_pipe[0], select.POLLIN)
+
+    def _open_poller(self):
+        """
+        Registers all devices with a level-triggered epoll.
+
+        The poller sleeps until a device is readable, with no timeout;
+        stop() wakes it through the registered self-pipe.
+        """
+        self._fd_map = {dev.fileno(): dev for dev in self.devices}
+        self._stop_pipe = os.pipe()
+        self._epoll = select.epoll()
+        for fd in self._fd_map:
+            self._epoll.register(fd, select.EPOLLIN)
+        self._epoll.register(self._stop_pipe[0], select.EPOLLIN)
+
+    def poll(self, timeout=None):
+        """
+        Waits for input and returns the decoded events of all ready devices.
+
+        This is the listener's single read step. It can also be called
+        directly for single-threaded use without start(); stop() still
+        releases the poller and devices.
+
+        Args:
+            timeout (float, optional): Max seconds to wait, None to wait forever.
+
+        Returns:
+            list: Event dicts (see _decode_events), possibly empty.
+        """
+        if self._epoll is None:
+            if not self.devices:
+                self.find_devices()
+            self._open_poller()
+
+        events = []
+        fd_map = self._fd_map
+        for fd, _ in self._epoll.poll(-1 if timeout is None else timeout):
+            dev = fd_map.get(fd)
+            if dev is None:
+                # Wake-up from stop()
+                continue
+            buf = os.read(fd, _READ_SIZE)
+            events.extend(self._decode_events(dev, _INPUT_EVENT.iter_unpack(buf)))
+        return events
+
     def stop(self):
         """
         Stops the input listening thread and closes devices.
         """
         self.running = False
+        if self._stop_pipe is not None:
+            os.write(self._stop_pipe[1], b"\0")
         if self.thread:
             self.thread.join(timeout=1.0)
 
+        if self._epoll is not None:
+            self._epoll.close()
+            self._epoll = None
+        if self._stop_pipe is not None:
+            for fd in self._stop_pipe:
+                os.close(fd)
+            self._stop_pipe = None
+
+        if self._wake_pipe is not None:
+            self._wake_poll.unregister(self._wake_pipe[0])
+            self._wake_poll = None
+            for fd in self._wake_pipe:
+                os.close(fd)
+            self._wake_pipe = None
+
         for dev in self.devices:
             try:
                 dev.close()
@@ -128,65 +347,133 @@ class InputManager:
                 pass
         logger.info("Input Listener gestoppt.")
 
+    def wait_for_events(self, timeout=None):
+        """
+        Blocks until the listener has queued new events or timeout elapses.
+
+        Args:
+            timeout (float, optional): Max seconds to wait, None to wait forever.
+
+        Returns:
+            bool: True if new events (or wake()) were signalled, False on
+                timeout. Returns False at once if the listener was not
+                started or has been stopped.
+        """
+        wake_pipe = self._wake_pipe
+        if wake_pipe is None:
+            return False
+        # Round up: waking a fraction of a millisecond early would just spin
+        ms = -1 if timeout is None else math.ceil(timeout * 1000)
+        if not self._wake_poll.poll(ms):
+            return False
+        try:
+            os.read(wake_pipe[0], 4096)
+        except BlockingIOError:
+            pass
+        return True
+
+    def wake(self):
+        """
+        Wakes a consumer blocked in wait_for_events().
+
+        Async-signal-safe: a single non-blocking pipe write, no locks.
+        A full pipe means a wake-up is already pending. No-op before start()
+        and after stop().
+        """
+        wake_pipe = self._wake_pipe
+        if wake_pipe is None:
+            return
+        try:
+            os.write(wake_pipe[1], b"\0")
+        except OSError:
+            pass
+
+    def drain_events(self):
+        """
+        Removes and returns all currently queued events.
+
+        Pops a snapshot of len(event_queue) items: the listener only ever
+        appends, so the snapshot never over-reads and no IndexError has to
+        be raised to detect the end of a batch. Must only be called from
+        the single consumer thread.
+
+        Returns:
+            list: Event dicts in arrival order, possibly empty.
+        """
+        popleft = self.event_queue.popleft
+        return [popleft() for _ in range(len(self.event_queue))]
+
     def _loop(self):
         """
         Main loop that reads events from devices.
         """
         while self.running:
             try:
-                # select(rlist, wlist, xlist, timeout)
-                r, _, _ = select.select(self.devices, [], [], 0.5)
-
-                for dev in r:
-                    for event in dev.read():
-                        self._handle_event(dev, event)
-
+                self._enqueue(self.poll())
             except Exception as e:
                 if self.running:
-                    logger.error(f"Fehler im Input-Loop: {e}")
+                    logger.error("Fehler im Input-Loop: %s", e)
                     time.sleep(1)
 
-    def _handle_event(self, dev, event):
+    def _enqueue(self, events):
         """
-        Processes a single input event.
+        Hands decoded events to the consumer, waking it once per batch.
         """
-        # Only handle key events (includes mouse buttons)
-        if event.type == evdev.ecodes.EV_KEY:
+        if events:
+            self.event_queue.extend(events)
+            self.wake()
+
+    def _decode_events(self, dev, events):
+        """
+        Converts raw input events into event dicts.
+
+        Only key-down events (keys and mouse buttons) are recorded; EV_SYN,
+        EV_MSC and motion events are skipped before any further dispatch.
+
+        Args:
+            dev: Device the events were read from.
+            events: Iterable of (sec, usec, type, code, value) tuples.
+
+        Returns:
+            list: Click and key event dicts in input order.
+        """
+        decoded = []
+        append = decoded.append
+        cursor_position_fn = self.cursor_position_fn
+        log_keys = self.log_keys
+
+        for sec, usec, etype, code, value in events:
+            # Only key-down events matter (includes mouse buttons)
+            if etype != _EV_KEY or value != 1:
+                continue
+
             # Mouse buttons are also EV_KEY
-            is_mbutton = event.code in [
-                evdev.ecodes.BTN_LEFT,
-                evdev.ecodes.BTN_RIGHT,
-                evdev.ecodes.BTN_MIDDLE
-            ]
-
-            if is_mbutton:
-                if event.value == 1:
-                    btn_name = evdev.ecodes.BTN[event.code]
-                    # Get real cursor position from compositor
-                    x, y = 0, 0
-                    if self.cursor_position_fn:
-                        pos = self.cursor_position_fn()
-                        if pos:
-                            x, y = pos
-                        else:
-                            logger.warning("cursor_position_fn returned None")
-                    logger.info(f"Mausklick: {btn_name} bei {x},{y}")
-                    self.event_queue.put({
-                        'type': 'click',
-                        'button': btn_name,
-                        'x': x,
-                        'y': y,
-                        'time': time.time()
-                    })
-            elif self.log_keys and event.value == 1:  # Key Down
-                key_name = (
-                    evdev.ecodes.KEY[event.code]
-                    if event.code in evdev.ecodes.KEY
-                    else f"UNK_{event.code}"
-                )
-                logger.info(f"Taste gedrückt: {key_name} (auf {dev.name})")
-                self.event_queue.put({
+            if code in _MOUSE_BTNS:
+                btn_name = _BTN_NAMES[code]
+                # Get real cursor position from compositor
+                x, y = 0, 0
+                if cursor_position_fn:
+                    pos = cursor_position_fn()
+                    if pos:
+                        x, y = pos
+                    else:
+                        logger.warning("cursor_position_fn returned None")
+                # Clicks are logged by the consumer (main) once the monitor is known
+                append({
+                    'type': 'click',
+                    'button': btn_name,
+                    'x': x,
+                    'y': y,
+                    'time': sec + usec / 1000000.0
+                })
+            elif log_keys:
+                key_name = _KEY_NAMES.get(code) or f"UNK_{code}"
+                if self._log_info:
+                    logger.info("Taste gedrückt: %s (auf %s)", key_name, dev.name)
+                append({
                     'type': 'key',
                     'key': key_name,
-                    'time': time.time()
-                })
\ No newline at end of file
+                    'time': sec + usec / 1000000.0
+                })
+
+        return decoded
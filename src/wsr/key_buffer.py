@@ -1,9 +1,36 @@
+import string
 import time
 
+# Interval timing only needs a steady clock; monotonic is immune to wall-clock jumps
+_now = time.monotonic
+
+# Readable characters for Linux key names, built once at import.
+# Anything not listed is rendered as "[NAME]" (e.g. KEY_LEFTSHIFT -> "[LEFTSHIFT]")
+# on first use and memoized here, so repeated keys share one str object
+# instead of allocating a new one per keystroke. Bounded by the finite set
+# of key names the listener can emit.
+_KEYMAP = {f"KEY_{c}": c for c in string.ascii_uppercase + string.digits}
+_KEYMAP.update({
+    "KEY_SPACE": " ",
+    "KEY_ENTER": "\n",
+    "KEY_BACKSPACE": "⌫",
+})
+
+# Adaptive grouping: the effective timeout follows the typist's rhythm,
+# min(interval, 2 * average gap + slack), so fast typing is flushed sooner
+# while the configured interval stays the upper bound. Every key feeds the
+# average; a gap that ended a group counts as at most one interval, so the
+# timeout grows back after a fast burst.
+_EWMA_ALPHA = 0.25
+_GAP_SLACK = 0.02
+
 
 class KeyBuffer:
     """
     Groups rapid keystrokes into a single string event based on a timeout.
+
+    The timeout adapts to the observed gap between grouped keystrokes and
+    never exceeds the configured interval.
     """
 
     def __init__(self, interval_ms):
@@ -20,37 +47,69 @@ class KeyBuffer:
             raise ValueError("interval_ms must be non-negative")
         self.interval = interval_ms / 1000.0
         self.buffer = []
-        self.last_time = 0
+        self.last_time = None
+        # Smoothed gap between grouped keys and the timeout derived from it
+        self._ewma_gap = self.interval
+        self.threshold = self.interval
 
-    def add(self, key_name):
+    def add(self, key_name, now=None):
         """
-        Adds a key to the buffer if within the interval.
+        Adds a key to the buffer if within the current threshold.
 
         Args:
             key_name (str): The raw Linux key name (e.g., 'KEY_A').
+            now (float, optional): Current time.monotonic() value, if the
+                caller already has one.
 
         Returns:
             bool: True if added, False if buffer needs flushing first.
         """
         char = self._map_key(key_name)
-        now = time.time()
+        if now is None:
+            now = _now()
 
-        if not self.buffer or (now - self.last_time) <= self.interval:
-            self.buffer.append(char)
-            self.last_time = now
-            return True
-        return False
+        last_time = self.last_time
+        if last_time is not None:
+            gap = now - last_time
+            if self.buffer and gap > self.threshold:
+                return False
+            if gap > self.interval:
+                gap = self.interval
+            self._ewma_gap += _EWMA_ALPHA * (gap - self._ewma_gap)
+            threshold = 2 * self._ewma_gap + _GAP_SLACK
+            self.threshold = threshold if threshold < self.interval else self.interval
 
-    def is_timed_out(self):
+        self.buffer.append(char)
+        self.last_time = now
+        return True
+
+    def is_timed_out(self, now=None):
         """
         Checks if the buffer has timed out.
 
+        Args:
+            now (float, optional): Current time.monotonic() value, if the
+                caller already has one.
+
         Returns:
-            bool: True if the interval has passed since the last key.
+            bool: True if the threshold has passed since the last key.
         """
         if not self.buffer:
             return False
-        return (time.time() - self.last_time) > self.interval
+        if now is None:
+            now = _now()
+        return (now - self.last_time) > self.threshold
+
+    def next_deadline(self):
+        """
+        Returns the time at which the buffered keys time out.
+
+        Returns:
+            float or None: Timestamp (time.monotonic() scale) or None if empty.
+        """
+        if not self.buffer:
+            return None
+        return self.last_time + self.threshold
 
     def flush(self):
         """
@@ -65,21 +124,19 @@ class KeyBuffer:
         self.buffer = []
         return text
 
-    def _map_key(self, key_name):
+    @staticmethod
+    def _map_key(key_name):
         """
         Internal helper to map Linux keycodes to readable characters.
         """
+        char = _KEYMAP.get(key_name)
+        if char is not None:
+            return char
         if not key_name:
             return ""
         if key_name.startswith("KEY_"):
-            k = key_name[4:]
-            if len(k) == 1:
-                return k
-            if k == "SPACE":
-                return " "
-            if k == "ENTER":
-                return "\n"
-            if k == "BACKSPACE":
-                return "⌫"
-            return f"[{k}]"
-        return key_name
\ No newline at end of file
+            char = f"[{key_name[4:]}]"
+        else:
+            char = key_name
+        _KEYMAP[key_name] = char
+        return char
@@ -1,20 +1,20 @@
 import argparse
+import functools
 import json
 import logging
+import math
 import signal
 import sys
+import threading
 import time
 import os
 import subprocess
 
-# Local package imports
-from .input_manager import InputManager
-from .screenshot_engine import ScreenshotEngine
-from .screenshot_worker import ScreenshotWorker
-from .report_generator import ReportGenerator
-from .monitor_manager import MonitorManager
+# Local package imports. The recording backends (evdev, PIL, ...) are
+# imported lazily in main() so --help, --toggle and the countdown start fast.
 from .key_buffer import KeyBuffer
-from .i18n import _, init_i18n, _instance
+from . import i18n
+from .i18n import _, init_i18n
 from .config import load_config, resolve_output_path, resolve_style_path, ConfigError
 
 # Configure logging
@@ -29,9 +29,24 @@ logger = logging.getLogger(__name__)
 STATE_FILE = "/tmp/wsr_state.json"
 
 
+def _own_start_time():
+    """Eigene Startzeit in Clock-Ticks (/proc/self/stat, Feld 22), None ohne /proc."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        return int(stat[stat.rindex(b")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
 def write_state(state: str, **kwargs):
-    """Atomares Schreiben der State-Datei. Rename ist atomar auf POSIX."""
-    data = {"state": state, "pid": os.getpid(), **kwargs}
+    """
+    Atomares Schreiben der State-Datei. Rename ist atomar auf POSIX.
+
+    Besides the PID, the process start time is stored so readers can tell
+    wsr apart from a later process that reused the PID.
+    """
+    data = {"state": state, "pid": os.getpid(), "pid_start": _own_start_time(), **kwargs}
     tmp = STATE_FILE + ".tmp"
     try:
         fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
@@ -39,7 +54,7 @@ def write_state(state: str, **kwargs):
             json.dump(data, f)
         os.rename(tmp, STATE_FILE)
     except OSError as e:
-        logger.debug(f"State-Datei konnte nicht geschrieben werden: {e}")
+        logger.debug("State-Datei konnte nicht geschrieben werden: %s", e)
 
 
 def remove_state():
@@ -49,7 +64,7 @@ def remove_state():
     except FileNotFoundError:
         pass
     except OSError as e:
-        logger.debug(f"State-Datei konnte nicht entfernt werden: {e}")
+        logger.debug("State-Datei konnte nicht entfernt werden: %s", e)
 
 
 def signal_handler(sig, frame):
@@ -67,8 +82,6 @@ def _notify_and_open(title, message, file_path, preexec_fn=None, env=None):
     Runs in a daemon thread because notify-send blocks until the user
     clicks or the notification expires.
     """
-    import threading
-
     def _worker():
         try:
             open_label = _('gui_open')
@@ -91,6 +104,38 @@ def _notify_and_open(title, message, file_path, preexec_fn=None, env=None):
     threading.Thread(target=_worker, daemon=False).start()
 
 
+@functools.lru_cache(maxsize=1)
+def _sudo_user_context(sudo_user):
+    """
+    Builds the environment and privilege-drop hook for running as sudo_user.
+
+    Cached: the passwd entry and environment don't change during a run, so
+    repeated notifications skip the getpwnam lookup and the environ copy.
+
+    Returns:
+        tuple: (env dict, preexec_fn)
+    """
+    import pwd
+    pw = pwd.getpwnam(sudo_user)
+    uid = pw.pw_uid
+    gid = pw.pw_gid
+
+    # Prepare environment for the user
+    env = os.environ.copy()
+    env["HOME"] = pw.pw_dir
+    env["USER"] = sudo_user
+    env["LOGNAME"] = sudo_user
+    env["XDG_RUNTIME_DIR"] = f"/run/user/{uid}"
+    if "DBUS_SESSION_BUS_ADDRESS" not in env:
+        env["DBUS_SESSION_BUS_ADDRESS"] = f"unix:path=/run/user/{uid}/bus"
+
+    def drop_privileges():
+        os.setgid(gid)
+        os.setuid(uid)
+
+    return env, drop_privileges
+
+
 def send_notification(title, message, file_path=None):
     """
     Sends a system notification as the original user via notify-send.
@@ -117,24 +162,7 @@ def send_notification(title, message, file_path=None):
         return
 
     try:
-        import pwd
-        pw = pwd.getpwnam(sudo_user)
-        uid = pw.pw_uid
-        gid = pw.pw_gid
-        home = pw.pw_dir
-
-        # Prepare environment for the user
-        env = os.environ.copy()
-        env["HOME"] = home
-        env["USER"] = sudo_user
-        env["LOGNAME"] = sudo_user
-        env["XDG_RUNTIME_DIR"] = f"/run/user/{uid}"
-        if "DBUS_SESSION_BUS_ADDRESS" not in env:
-            env["DBUS_SESSION_BUS_ADDRESS"] = f"unix:path=/run/user/{uid}/bus"
-
-        def drop_privileges():
-            os.setgid(gid)
-            os.setuid(uid)
+        env, drop_privileges = _sudo_user_context(sudo_user)
 
         if file_path:
             _notify_and_open(
@@ -151,20 +179,37 @@ def send_notification(title, message, file_path=None):
             )
 
     except Exception as e:
-        logger.debug(f"Konnte Benachrichtigung nicht senden: {e}")
+        logger.debug("Konnte Benachrichtigung nicht senden: %s", e)
         # Fallback: Print to stderr
         print(f"\n[{title}] {message}")
 
 
-def parse_arguments():
+def _flush_key_group(key_buffer, captured_events, timestamp):
     """
-    Parses command line arguments.
-    Config: CLI overrides wsr.yaml over hardcoded defaults.
-    Returns:
-        argparse.Namespace: The parsed arguments.
+    Flushes the key buffer into captured_events as a 'key_group' event.
+
+    Args:
+        key_buffer (KeyBuffer): Buffer to flush.
+        captured_events (list): Event list to append to.
+        timestamp (float): Wall-clock time stored on the key_group event.
     """
-    config = load_config()
+    text = key_buffer.flush()
+    if text:
+        captured_events.append({
+            'type': 'key_group',
+            'text': text,
+            'time': timestamp
+        })
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """
+    Builds the argument parser once; config defaults are applied per call.
 
+    Returns:
+        argparse.ArgumentParser: The CLI parser.
+    """
     parser = argparse.ArgumentParser(
         description="WSR - Wayland Session Recorder (Python Port)"
     )
@@ -201,8 +246,8 @@ def parse_arguments():
     parser.add_argument(
         "--image-format",
         choices=["png", "jpg", "webp"],
-        default="png",
-        help="Bildformat der Screenshots (Standard: png)"
+        default="webp",
+        help="Bildformat der Screenshots (Standard: webp)"
     )
 
     def quality_type(x):
@@ -218,6 +263,19 @@ def parse_arguments():
         help="Qualitätsfaktor für jpg/webp (0.1-1.0, Standard: 0.9)"
     )
 
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Farbarme Screenshots verlustfrei speichern: 8-Bit-Palette bei höchstens 256 Farben, sonst WebP lossless bei Bildschirminhalt (webp/png)"
+    )
+
+    parser.add_argument(
+        "--no-inline-images",
+        action="store_false",
+        dest="inline_images",
+        help="Screenshots als Dateien neben dem Report ablegen statt Base64 einzubetten"
+    )
+
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -241,7 +299,8 @@ def parse_arguments():
         "--key-interval",
         type=int,
         default=500,
-        help="Zeitintervall in ms, um Tastenanschläge zu gruppieren (Standard: 500)"
+        help="Maximales Zeitintervall in ms, um Tastenanschläge zu gruppieren; "
+             "passt sich schnellem Tippen an (Standard: 500)"
     )
 
     parser.add_argument(
@@ -264,8 +323,21 @@ def parse_arguments():
     parser.add_argument("--no-blink", action="store_true",
                         help=argparse.SUPPRESS)
 
-    parser.set_defaults(**config)
-    return parser.parse_args()
+    return parser
+
+
+def parse_arguments():
+    """
+    Parses command line arguments.
+    Config: CLI overrides wsr.yaml over hardcoded defaults.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    # Config values are preset on the namespace; argparse only fills in its
+    # own defaults for missing attributes, so the cached parser stays untouched
+    config = load_config()
+    return _build_parser().parse_args(namespace=argparse.Namespace(**config))
 
 
 def main():
@@ -309,17 +381,37 @@ def main():
 
     if args.countdown > 0:
         logger.info(_("starting_in", n=args.countdown))
-        write_state("countdown", end_time=time.time() + args.countdown)
+        end_time = time.time() + args.countdown
+        write_state("countdown", end_time=end_time)
         try:
-            for i in range(args.countdown, 0, -1):
-                write_state("countdown", remaining=i, end_time=time.time() + i)
-                print(f"{i}...", end=" ", flush=True)
-                time.sleep(1)
+            # Sleep against a fixed deadline so state writes and printing
+            # don't add up to drift; Ctrl+C interrupts the sleep directly.
+            deadline = time.monotonic() + args.countdown
+            remaining = float(args.countdown)
+            while remaining > 0:
+                n = math.ceil(remaining)
+                write_state("countdown", remaining=n, end_time=end_time)
+                print(f"{n}...", end=" ", flush=True)
+                time.sleep(remaining - (n - 1))
+                remaining = deadline - time.monotonic()
             print("Start!")
         except KeyboardInterrupt:
             remove_state()
             signal_handler(signal.SIGINT, None)
 
+    try:
+        from .input_manager import InputManager
+        from .screenshot_engine import ScreenshotEngine
+        from .screenshot_worker import ScreenshotWorker
+        from .report_generator import ReportGenerator
+        from .monitor_manager import MonitorManager
+    except ImportError as e:
+        error_msg = _("error_missing_dependency", error=e)
+        logger.error(error_msg)
+        remove_state()
+        send_notification(_("notif_error_title"), error_msg)
+        sys.exit(1)
+
     write_state("recording", start_time=time.time())
     logger.info(_("recording_started"))
 
@@ -336,63 +428,63 @@ def main():
         key_buffer = KeyBuffer(args.key_interval)
 
         if monitor_mgr.monitors:
-            max_x = max(m['x'] + m['width'] for m in monitor_mgr.monitors)
-            max_y = max(m['y'] + m['height'] for m in monitor_mgr.monitors)
+            max_x, max_y = monitor_mgr.get_virtual_desktop_size()
             logger.info(_("virtual_desktop_size", width=max_x, height=max_y))
 
         input_mgr.log_keys = not args.no_keys
-        screenshot_engine = ScreenshotEngine()
+        screenshot_engine = ScreenshotEngine(quantize=args.quantize)
         screenshot_worker = ScreenshotWorker(screenshot_engine, max_workers=2)
 
         # Resolve style path and get language for report
         style_path = resolve_style_path(args.style)
-        lang = _instance.lang if _instance else "en"
+        lang = i18n._instance.lang if i18n._instance else "en"
         report_gen = ReportGenerator(
             output_path,
             lang=lang,
             custom_style_path=style_path,
             image_format=args.image_format,
-            image_quality=args.image_quality
+            image_quality=args.image_quality,
+            inline=args.inline_images
         )
 
+        # Ctrl+C during recording only requests a stop; the loop finishes its
+        # current batch and exits cooperatively instead of unwinding from
+        # wherever the signal happened to land.
+        stop_event = threading.Event()
+
+        def request_stop(sig, frame):
+            stop_event.set()
+            input_mgr.wake()
+
+        signal.signal(signal.SIGINT, request_stop)
         input_mgr.start()
 
-        while True:
+        while not stop_event.is_set():
+            # One clock read per wakeup. Keys carry kernel wall-clock stamps;
+            # the offset maps them onto the monotonic scale so every key in a
+            # batch keeps its real gap instead of sharing one timestamp.
+            now = time.monotonic()
+            wall_offset = time.time() - now
+
             # Check for key buffer timeout
-            if key_buffer.is_timed_out():
-                text = key_buffer.flush()
-                if text:
-                    captured_events.append({
-                        'type': 'key_group',
-                        'text': text,
-                        'time': time.time()
-                    })
-
-            while not input_mgr.event_queue.empty():
-                event = input_mgr.event_queue.get()
-                logger.debug(f"Event verarbeitet: {event}")
+            if key_buffer.is_timed_out(now):
+                _flush_key_group(key_buffer, captured_events, time.time())
+
+            for event in input_mgr.drain_events():
+                logger.debug("Event verarbeitet: %s", event)
 
                 if event['type'] == 'key':
+                    key_time = event['time'] - wall_offset
+                    if key_time > now:
+                        key_time = now
                     # Add to buffer, if it returns False, flush first
-                    if not key_buffer.add(event['key']):
-                        text = key_buffer.flush()
-                        if text:
-                            captured_events.append({
-                                'type': 'key_group',
-                                'text': text,
-                                'time': event['time']
-                            })
-                        key_buffer.add(event['key'])
+                    if not key_buffer.add(event['key'], key_time):
+                        _flush_key_group(key_buffer, captured_events, event['time'])
+                        key_buffer.add(event['key'], key_time)
 
                 elif event['type'] == 'click':
                     # Flush buffer on click to ensure order
-                    text = key_buffer.flush()
-                    if text:
-                        captured_events.append({
-                            'type': 'key_group',
-                            'text': text,
-                            'time': event['time']
-                        })
+                    _flush_key_group(key_buffer, captured_events, event['time'])
 
                     # Determine monitor
                     mon_name = monitor_mgr.get_monitor_at(event['x'], event['y'])
@@ -417,9 +509,14 @@ def main():
                 else:
                     captured_events.append(event)
 
-            time.sleep(0.05)
+            # Sleep until the listener signals new events; only wake early
+            # when buffered keys are due to be flushed.
+            timeout = key_buffer.next_deadline()
+            if timeout is not None:
+                timeout -= time.monotonic()
+                timeout = 0.0 if timeout < 0.0 else timeout
+            input_mgr.wait_for_events(timeout)
 
-    except KeyboardInterrupt:
         logger.info(_("recording_stopped"))
     except (OSError, subprocess.CalledProcessError) as e:
         # OSError: Screenshot-Tool nicht gefunden, Input-Device weg, etc.
@@ -429,6 +526,9 @@ def main():
         send_notification(_("notif_error_title"), error_msg)
         error_occurred = True
     finally:
+        # A second Ctrl+C during cleanup/report generation aborts as before
+        signal.signal(signal.SIGINT, signal_handler)
+
         # State-Datei aufräumen (für Waybar-Modul)
         remove_state()
 
@@ -436,19 +536,20 @@ def main():
         if input_mgr is not None:
             input_mgr.stop()
 
-        # Wait for pending screenshots (with timeout)
+        # Pending screenshots are awaited per event (with timeout) while the
+        # report is written, so finished steps go to disk in the meantime
+        ready = None
         if screenshot_worker is not None:
             pending = screenshot_worker.pending_count()
             if pending > 0:
                 logger.info(_("waiting_screenshots", n=pending))
-            screenshot_worker.wait_for_pending(timeout=5.0)
-            screenshot_worker.shutdown(wait=False)
+            ready = screenshot_worker.wait_for_event
 
         # Report generation - protected with its own try/except
         if captured_events and not error_occurred:
             try:
                 logger.info(_("generating_report", n=len(captured_events)))
-                report_gen.generate(captured_events)
+                report_gen.generate(captured_events, ready=ready)
                 send_notification(
                     _("notif_success_title"),
                     _("notif_success_message", path=output_path),
@@ -456,11 +557,14 @@ def main():
                 )
             except Exception as e:
                 # Blankes except hier ist OK - letzter Ausweg vor dem Exit
-                logger.error(f"Report generation failed: {e}")
+                logger.error("Report generation failed: %s", e)
                 sys.exit(1)
         elif not captured_events:
             logger.warning(_("no_events"))
 
+        if screenshot_worker is not None:
+            screenshot_worker.shutdown(wait=False)
+
         sys.exit(1 if error_occurred else 0)
 
 
@@ -1,10 +1,52 @@
 import subprocess
-import json
 import logging
+import os
+import socket
 import time
 
+try:
+    # Rust-backed parser, several times faster than the stdlib one
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 logger = logging.getLogger(__name__)
 
+# Hyprland answers each request on its own connection and closes it afterwards,
+# so every query connects anew - still far cheaper than fork+exec of hyprctl.
+_IPC_TIMEOUT = 1.0
+_IPC_RECV_SIZE = 8192
+# Batched requests are answered in one reply, joined by three newlines
+_BATCH_MONITORS_CURSOR = "[[BATCH]]j/monitors;cursorpos"
+_BATCH_SEPARATOR = "\n\n\n"
+# Cursor queries within this window share one IPC round-trip
+_CURSOR_TTL = 0.005
+# Edge length in pixels of the lookup grid cells in get_monitor_at
+_GRID_CELL = 256
+# Empty rect standing in for "no last hit"; matches no coordinates
+_NO_RECT = (0, 0, 0, 0, None)
+
+
+def _hypr_socket_path():
+    """
+    Locates Hyprland's request socket for the current instance.
+
+    Returns:
+        str: Socket path, or None if Hyprland's environment is not available.
+    """
+    sig = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not sig:
+        return None
+    # Under sudo the runtime dir belongs to the invoking user, not to root
+    uid = os.environ.get("SUDO_UID") or os.getuid()
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{uid}"
+    # Hyprland < 0.40 kept its sockets under /tmp/hypr
+    for base in (os.path.join(runtime, "hypr"), "/tmp/hypr"):
+        path = os.path.join(base, sig, ".socket.sock")
+        if os.path.exists(path):
+            return path
+    return None
+
 
 class MonitorManager:
     """
@@ -16,41 +58,144 @@ class MonitorManager:
         Initializes the MonitorManager and refreshes the layout.
         """
         self.monitors = []
+        self._sock_path = _hypr_socket_path()
+        self._cursor_cache = (0.0, None)  # (monotonic timestamp, (x, y))
         self._last_refresh = 0.0
         self._refresh_cooldown = 5.0  # Seconds between refresh attempts
         self.refresh()
 
+    @property
+    def monitors(self):
+        """List of monitor dicts (name, x, y, width, height)."""
+        return self._monitors
+
+    @monitors.setter
+    def monitors(self, monitors):
+        # Name -> monitor index and the last rect hit by get_monitor_at,
+        # rebuilt whenever the layout is replaced. Consecutive clicks mostly
+        # land on the same monitor.
+        self._monitors = monitors
+        self._by_name = {m['name']: m for m in monitors}
+        self._last = _NO_RECT
+        # Coarse grid: (x // cell, y // cell) -> rects overlapping that cell.
+        # A lookup is two floor divisions and a dict hit; cells on a monitor
+        # edge hold both neighbours and are resolved by the rect test. Rects
+        # are flat (x0, y0, x1, y1, name) tuples, so the test itself needs no
+        # dict lookups or additions.
+        grid = {}
+        for mon in monitors:
+            rect = (mon['x'], mon['y'], mon['x'] + mon['width'],
+                    mon['y'] + mon['height'], mon['name'])
+            for cx in range(rect[0] // _GRID_CELL, (rect[2] - 1) // _GRID_CELL + 1):
+                for cy in range(rect[1] // _GRID_CELL, (rect[3] - 1) // _GRID_CELL + 1):
+                    grid.setdefault((cx, cy), []).append(rect)
+        self._grid = grid
+
+    def _lookup(self, x, y):
+        """Returns the name of the monitor containing (x, y) or None."""
+        for rect in self._grid.get((x // _GRID_CELL, y // _GRID_CELL), ()):
+            x0, y0, x1, y1, name = rect
+            if x0 <= x < x1 and y0 <= y < y1:
+                self._last = rect
+                return name
+        return None
+
     def _should_refresh(self):
         """Check if cooldown has elapsed since last refresh."""
         return (time.time() - self._last_refresh) > self._refresh_cooldown
 
+    def _ipc(self, command):
+        """
+        Sends one request over Hyprland's IPC socket.
+
+        Args:
+            command: Request string, e.g. "j/monitors" or "cursorpos".
+
+        Returns:
+            str: The complete reply.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_IPC_TIMEOUT)
+            sock.connect(self._sock_path)
+            sock.sendall(command.encode())
+            chunks = []
+            while True:
+                chunk = sock.recv(_IPC_RECV_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return b"".join(chunks).decode()
+
+    def _query(self, command, hyprctl_args):
+        """
+        Queries Hyprland via socket, falling back to the hyprctl binary.
+
+        Args:
+            command: IPC request string.
+            hyprctl_args: Equivalent hyprctl arguments for the fallback.
+
+        Returns:
+            str: Reply text, or None if hyprctl reported an error.
+        """
+        if self._sock_path:
+            try:
+                return self._ipc(command)
+            except OSError as e:
+                logger.debug("Hyprland-Socket fehlgeschlagen: %s", e)
+        result = subprocess.run(
+            ["hyprctl", *hyprctl_args],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode == 0:
+            return result.stdout
+        return None
+
+    def _query_monitors(self):
+        """
+        Fetches the monitor list, batching a cursor query in when possible.
+
+        Over the socket both answers arrive in one round-trip; the cursor
+        position is stored in the cursor cache for get_cursor_position.
+
+        Returns:
+            str: JSON monitor list, or None if hyprctl reported an error.
+        """
+        if self._sock_path:
+            try:
+                reply = self._ipc(_BATCH_MONITORS_CURSOR)
+                monitors, _, cursor = reply.partition(_BATCH_SEPARATOR)
+                try:
+                    self._cursor_cache = (time.monotonic(), self._parse_cursor(cursor))
+                except (ValueError, IndexError):
+                    pass
+                return monitors
+            except OSError as e:
+                logger.debug("Hyprland-Socket fehlgeschlagen: %s", e)
+        return self._query("j/monitors", ["monitors", "-j"])
+
     def refresh(self):
         """
-        Fetches the current monitor layout using hyprctl.
+        Fetches the current monitor layout from Hyprland.
         """
         self._last_refresh = time.time()
         self.monitors = []
         try:
             # Try Hyprland
-            result = subprocess.run(
-                ["hyprctl", "monitors", "-j"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                for mon in data:
-                    self.monitors.append({
-                        'name': mon['name'],
-                        'x': mon['x'],
-                        'y': mon['y'],
-                        'width': mon['width'],
-                        'height': mon['height']
-                    })
-                logger.debug(f"Monitore erkannt: {len(self.monitors)}")
+            reply = self._query_monitors()
+            if reply is not None:
+                data = _json_loads(reply)
+                self.monitors = [{
+                    'name': mon['name'],
+                    'x': mon['x'],
+                    'y': mon['y'],
+                    'width': mon['width'],
+                    'height': mon['height']
+                } for mon in data]
+                logger.debug("Monitore erkannt: %d", len(self.monitors))
                 return
         except Exception as e:
-            logger.debug(f"hyprctl fehlgeschlagen: {e}")
+            logger.debug("hyprctl fehlgeschlagen: %s", e)
 
         logger.warning("Keine Monitordaten gefunden.")
 
@@ -59,21 +204,21 @@ class MonitorManager:
         Returns the name of the monitor containing coordinates (x, y).
         Triggers refresh if coordinates are outside known monitors.
         """
-        for mon in self.monitors:
-            if (mon['x'] <= x < mon['x'] + mon['width'] and
-                    mon['y'] <= y < mon['y'] + mon['height']):
-                return mon['name']
+        x0, y0, x1, y1, name = self._last
+        if x0 <= x < x1 and y0 <= y < y1:
+            return name
+
+        name = self._lookup(x, y)
+        if name is not None:
+            return name
 
         # Coordinates outside known monitors - maybe layout changed
         if self._should_refresh():
-            logger.debug(f"Coordinates ({x}, {y}) outside known monitors, refreshing...")
+            logger.debug("Coordinates (%s, %s) outside known monitors, refreshing...", x, y)
             self.refresh()
 
             # Retry after refresh
-            for mon in self.monitors:
-                if (mon['x'] <= x < mon['x'] + mon['width'] and
-                        mon['y'] <= y < mon['y'] + mon['height']):
-                    return mon['name']
+            return self._lookup(x, y)
 
         return None
 
@@ -81,25 +226,52 @@ class MonitorManager:
         """
         Converts global coordinates to relative coordinates for a monitor.
         """
+        mon = self._by_name.get(monitor_name)
+        if mon is None:
+            return x, y
+        return x - mon['x'], y - mon['y']
+
+    def get_virtual_desktop_size(self):
+        """
+        Returns the bounding size of all monitors in one pass.
+
+        Returns:
+            tuple: (width, height), (0, 0) if no monitors are known.
+        """
+        max_x = max_y = 0
         for mon in self.monitors:
-            if mon['name'] == monitor_name:
-                return x - mon['x'], y - mon['y']
-        return x, y
+            right = mon['x'] + mon['width']
+            bottom = mon['y'] + mon['height']
+            if right > max_x:
+                max_x = right
+            if bottom > max_y:
+                max_y = bottom
+        return max_x, max_y
+
+    @staticmethod
+    def _parse_cursor(reply):
+        """Parses a "x, y" cursorpos reply into an (x, y) tuple."""
+        parts = reply.strip().split(", ")
+        return int(parts[0]), int(parts[1])
 
     def get_cursor_position(self):
         """
         Returns current cursor position from Hyprland.
         Returns (x, y) tuple or None on failure.
+
+        Positions younger than a few milliseconds are served from cache, so
+        consumers within the same loop tick share one query.
         """
+        ts, pos = self._cursor_cache
+        now = time.monotonic()
+        if pos is not None and now - ts < _CURSOR_TTL:
+            return pos
         try:
-            result = subprocess.run(
-                ["hyprctl", "cursorpos"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                parts = result.stdout.strip().split(", ")
-                return int(parts[0]), int(parts[1])
+            reply = self._query("cursorpos", ["cursorpos"])
+            if reply is not None:
+                pos = self._parse_cursor(reply)
+                self._cursor_cache = (now, pos)
+                return pos
         except Exception as e:
-            logger.debug(f"hyprctl cursorpos failed: {e}")
+            logger.debug("hyprctl cursorpos failed: %s", e)
         return None
\ No newline at end of file
@@ -1,20 +1,129 @@
-import base64
+import html
 import io
 import logging
 import os
+import shutil
+import time
+from urllib.parse import quote
 from datetime import datetime
 from PIL import Image
-from .i18n import _
+from .i18n import _, raw
+from .screenshot_engine import PNG_COMPRESS_LEVEL
+
+try:
+    # SIMD base64 encoder, several times faster than the stdlib one
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
 
 logger = logging.getLogger(__name__)
 
+# Screenshots are base64-encoded straight into the report file in slices of
+# this many raw bytes (a multiple of 3, so no padding appears mid-stream).
+_B64_CHUNK = 3 * 16384
+
+# Write buffer for the report file
+_WRITE_BUFFER = 1 << 20
+
+# File extensions for screenshots written next to the report (inline=False)
+_MIME_EXT = {"image/webp": "webp", "image/jpeg": "jpg", "image/png": "png"}
+
+# Built-in report stylesheet; static, so kept out of the header f-string
+_STATIC_CSS = """        :root {
+            --bg-color: #f0f0f0;
+            --card-bg: #ffffff;
+            --text-color: #333333;
+            --meta-color: #666666;
+            --border-color: #cccccc;
+            --shadow: rgba(0,0,0,0.1);
+        }
+
+        @media (prefers-color-scheme: dark) {
+            :root {
+                --bg-color: #121212;
+                --card-bg: #1e1e1e;
+                --text-color: #e0e0e0;
+                --meta-color: #b0b0b0;
+                --border-color: #333333;
+                --shadow: rgba(0,0,0,0.5);
+            }
+        }
+
+        body {
+            font-family: sans-serif;
+            background: var(--bg-color);
+            color: var(--text-color);
+            margin: 20px;
+            transition: background 0.3s, color 0.3s;
+        }
+        .step {
+            background: var(--card-bg);
+            border: 1px solid var(--border-color);
+            padding: 15px;
+            margin-bottom: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px var(--shadow);
+        }
+        .step img {
+            max-width: 100%;
+            height: auto;
+            border: 1px solid var(--border-color);
+            margin-top: 10px;
+            display: block;
+        }
+        .meta {
+            color: var(--meta-color);
+            font-size: 0.9em;
+            margin-bottom: 5px;
+        }
+        .description {
+            font-weight: bold;
+            font-size: 1.1em;
+        }
+        h1 {
+            color: var(--text-color);
+        }
+"""
+
+
+class _Base64Writer:
+    """
+    File-like sink that base64-encodes everything written to it into f.
+
+    Lets PIL stream an encoded image straight into the report without an
+    intermediate BytesIO. Raw bytes are held back until a multiple of 3 is
+    available, so no padding appears mid-stream; close() writes the rest.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._pending = bytearray()
+
+    def write(self, data):
+        pending = self._pending
+        pending += data
+        if len(pending) >= _B64_CHUNK:
+            cut = len(pending) - len(pending) % 3
+            self._f.write(_b64encode(memoryview(pending)[:cut]))
+            del pending[:cut]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._pending:
+            self._f.write(_b64encode(self._pending))
+            self._pending.clear()
+
 
 class ReportGenerator:
     """
     Handles the generation of an HTML report from captured session events.
     """
 
-    def __init__(self, output_path, lang="en", custom_style_path=None, image_format="png", image_quality=0.9):
+    def __init__(self, output_path, lang="en", custom_style_path=None, image_format="png", image_quality=0.9,
+                 inline=True):
         """
         Initializes the ReportGenerator.
 
@@ -24,20 +133,27 @@ class ReportGenerator:
             custom_style_path (str): Optional path to custom CSS file.
             image_format (str): Output format ('png', 'jpg', 'webp').
             image_quality (float): Quality for lossy formats (0.1-1.0).
+            inline (bool): Embed screenshots as base64. If False, they are
+                written to '<report name>_assets/' and linked relatively.
         """
         self.output_path = output_path
         self.lang = lang
         self.custom_css = self._load_custom_css(custom_style_path)
         self.image_format = image_format
         self.image_quality = image_quality
+        self.inline = inline
+        self.assets_dir = os.path.splitext(output_path)[0] + "_assets"
 
     def _load_custom_css(self, style_path):
         """Load custom CSS from file if provided and exists."""
-        if not style_path or not os.path.isfile(style_path):
+        if not style_path:
             return None
+        # resolve_style_path() has already stat'ed the file; just open it
         try:
             with open(style_path, "r", encoding="utf-8") as f:
                 return f.read()
+        except FileNotFoundError:
+            return None
         except OSError as e:
             logger.warning("Could not load custom CSS: %s", e)
             return None
@@ -56,61 +172,7 @@ class ReportGenerator:
     <meta charset="UTF-8">
     <title>{_('report_title')}</title>
     <style>
-        :root {{
-            --bg-color: #f0f0f0;
-            --card-bg: #ffffff;
-            --text-color: #333333;
-            --meta-color: #666666;
-            --border-color: #cccccc;
-            --shadow: rgba(0,0,0,0.1);
-        }}
-
-        @media (prefers-color-scheme: dark) {{
-            :root {{
-                --bg-color: #121212;
-                --card-bg: #1e1e1e;
-                --text-color: #e0e0e0;
-                --meta-color: #b0b0b0;
-                --border-color: #333333;
-                --shadow: rgba(0,0,0,0.5);
-            }}
-        }}
-
-        body {{
-            font-family: sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            margin: 20px;
-            transition: background 0.3s, color 0.3s;
-        }}
-        .step {{
-            background: var(--card-bg);
-            border: 1px solid var(--border-color);
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px var(--shadow);
-        }}
-        .step img {{
-            max-width: 100%;
-            height: auto;
-            border: 1px solid var(--border-color);
-            margin-top: 10px;
-            display: block;
-        }}
-        .meta {{
-            color: var(--meta-color);
-            font-size: 0.9em;
-            margin-bottom: 5px;
-        }}
-        .description {{
-            font-weight: bold;
-            font-size: 1.1em;
-        }}
-        h1 {{
-            color: var(--text-color);
-        }}
-    </style>
+{_STATIC_CSS}    </style>
 {self._custom_style_tag()}</head>
 <body>
     <h1>{_('report_header')}</h1>
@@ -123,33 +185,39 @@ class ReportGenerator:
 </html>
 """
 
-    def _img_to_base64(self, event):
+    def _screenshot_payload(self, event):
         """
-        Returns Base64 data URI from event's screenshot data.
-        
-        Supports two formats:
-        - New: pre-compressed bytes in event['screenshot_bytes'] + event['screenshot_mime']
-        - Legacy: PIL.Image in event['screenshot'] (for backwards compatibility)
+        Returns the event's encoded screenshot as (mime_type, bytes), or None.
         """
         # New format: already compressed bytes (memory-efficient path)
         if 'screenshot_bytes' in event:
-            img_str = base64.b64encode(event['screenshot_bytes']).decode("utf-8")
-            return f"data:{event['screenshot_mime']};base64,{img_str}"
-        
+            return event['screenshot_mime'], event['screenshot_bytes']
+
         # Legacy format: PIL.Image (kept for backwards compatibility)
-        if 'screenshot' in event:
-            return self._legacy_pil_to_base64(event['screenshot'])
-        
-        return ""
+        if event.get('screenshot') is not None:
+            return self._encode_pil(event['screenshot'])
+
+        return None
 
-    def _legacy_pil_to_base64(self, pil_img):
+    def _encode_pil(self, pil_img):
         """
-        Converts a PIL Image to a Base64 string using configured format and quality.
-        Legacy path - only used if screenshot wasn't pre-compressed.
+        Encodes a PIL Image using the configured format and quality.
+
+        Returns:
+            tuple: (mime_type, encoded bytes)
+        """
+        pil_img, pil_format, mime_type, save_kwargs = self._pil_save_args(pil_img)
+        buffered = io.BytesIO()
+        pil_img.save(buffered, format=pil_format, **save_kwargs)
+        return mime_type, buffered.getvalue()
+
+    def _pil_save_args(self, pil_img):
         """
-        if pil_img is None:
-            return ""
+        Resolves PIL format, MIME type and save options for the configured format.
 
+        Returns:
+            tuple: (image to save, PIL format, mime_type, save kwargs)
+        """
         # Mapping for PIL and Data URI
         fmt = self.image_format.lower()
         pil_format = "PNG"
@@ -172,63 +240,146 @@ class ReportGenerator:
             pil_format = "WEBP"
             mime_type = "image/webp"
             save_kwargs["quality"] = int(self.image_quality * 100)
+        else:
+            save_kwargs["compress_level"] = PNG_COMPRESS_LEVEL
 
-        buffered = io.BytesIO()
-        pil_img.save(buffered, format=pil_format, **save_kwargs)
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-        return f"data:{mime_type};base64,{img_str}"
+        return pil_img, pil_format, mime_type, save_kwargs
+
+    def _write_pil_img_tag(self, f, pil_img):
+        """
+        Writes an <img> tag for a PIL Image, encoding it straight into f.
+        """
+        pil_img, pil_format, mime_type, save_kwargs = self._pil_save_args(pil_img)
+        f.write(f'<img src="data:{mime_type};base64,'.encode("ascii"))
+        sink = _Base64Writer(f)
+        pil_img.save(sink, format=pil_format, **save_kwargs)
+        sink.close()
+        f.write(b'" alt="Screenshot">')
+
+    @staticmethod
+    def _write_img_tag(f, mime_type, data):
+        """
+        Writes an <img> tag with a base64 data URI directly to f.
+
+        The image is encoded slice by slice, so the full base64 string is
+        never held in memory next to the raw bytes. f is a binary file: the
+        base64 bytes go to the write buffer without a str round-trip.
+        """
+        f.write(f'<img src="data:{mime_type};base64,'.encode("ascii"))
+        view = memoryview(data)
+        for start in range(0, len(view), _B64_CHUNK):
+            f.write(_b64encode(view[start:start + _B64_CHUNK]))
+        f.write(b'" alt="Screenshot">')
 
-    def generate(self, events):
+    def _write_asset(self, event, index):
+        """
+        Writes the event's screenshot into the assets directory.
+
+        Returns:
+            str: Relative URL for the <img> tag, or None without screenshot.
+        """
+        payload = self._screenshot_payload(event)
+        if payload is None:
+            return None
+        mime_type, data = payload
+        name = f"{index:04d}.{_MIME_EXT.get(mime_type, 'bin')}"
+        with open(os.path.join(self.assets_dir, name), "wb") as img_file:
+            img_file.write(data)
+        return f"{quote(os.path.basename(self.assets_dir))}/{name}"
+
+    def generate(self, events, ready=None):
         """
         Generates the HTML report from a list of events.
 
+        The report is streamed to a temporary file next to output_path and
+        renamed into place once complete, so peak memory stays at one
+        screenshot and a failed run never leaves a truncated report behind.
+
         Args:
             events (list): List of event dictionaries to include in the report.
+            ready (callable, optional): Called with each event before it is
+                written; blocks until that event's screenshot is available.
         """
         date_str = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+        tmp_path = self.output_path + ".part"
+        created_assets = False
+        done = False
+
+        try:
+            if not self.inline and not os.path.isdir(self.assets_dir):
+                os.makedirs(self.assets_dir)
+                created_assets = True
 
-        html_parts = [self._build_header()]
-        html_parts.append(f"<p>{_('report_date', date=date_str)}</p>")
-        html_parts.append('<div id="steps">')
-
-        for event in events:
-            time_str = datetime.fromtimestamp(
-                event.get('time', 0)
-            ).strftime('%H:%M:%S.%f')[:-3]
-
-            if event['type'] == 'click':
-                desc = _('desc_click', 
-                          button=event.get('button', 'Unknown'),
-                          x=event.get('x'), 
-                          y=event.get('y'))
-            elif event['type'] == 'key':
-                desc = _('desc_key', key=event.get('key', 'Unknown'))
-            elif event['type'] == 'key_group':
-                desc = _('desc_typing', text=event.get('text', ''))
-            else:
-                desc = f"{_('Ereignis')}: {event['type']}"
-
-            img_tag = ""
-            if 'screenshot_bytes' in event or 'screenshot' in event:
-                b64_img = self._img_to_base64(event)
-                if b64_img:
-                    img_tag = f'<img src="{b64_img}" alt="Screenshot">'
-
-            step_html = f"""
+            with open(tmp_path, "wb", buffering=_WRITE_BUFFER) as f:
+                f.write(self._build_header().encode("utf-8"))
+                f.write(f"<p>{_('report_date', date=date_str)}</p>".encode("utf-8"))
+                f.write(b'<div id="steps">')
+
+                # Resolve templates once instead of per event
+                fmt_click = raw('desc_click').format
+                fmt_key = raw('desc_key').format
+                fmt_typing = raw('desc_typing').format
+                event_label = _('Ereignis')
+                escape = html.escape
+                # Wall-clock times via integer math instead of a datetime per
+                # event; the UTC offset is taken once, at session start.
+                tz_offset = time.localtime(
+                    events[0].get('time', 0) if events else None
+                ).tm_gmtoff
+
+                for index, event in enumerate(events):
+                    # Round to microseconds first, as datetime does
+                    ms = round((event.get('time', 0) + tz_offset) * 1000000) // 1000
+                    secs, ms = divmod(ms, 1000)
+                    mins, secs = divmod(secs, 60)
+                    hours, mins = divmod(mins, 60)
+                    time_str = f"{hours % 24:02d}:{mins:02d}:{secs:02d}.{ms:03d}"
+
+                    # Recorded values are escaped: typed text may contain markup
+                    event_type = event['type']
+                    if event_type == 'click':
+                        desc = fmt_click(button=escape(str(event.get('button', 'Unknown'))),
+                                         x=event.get('x'),
+                                         y=event.get('y'))
+                    elif event_type == 'key':
+                        desc = fmt_key(key=escape(str(event.get('key', 'Unknown'))))
+                    elif event_type == 'key_group':
+                        desc = fmt_typing(text=escape(event.get('text', '')))
+                    else:
+                        desc = f"{event_label}: {escape(str(event_type))}"
+
+                    f.write(f"""
             <div class="step">
                 <div class="meta">{time_str}</div>
                 <div class="description">{desc}</div>
-                {img_tag}
+                """.encode("utf-8"))
+                    if ready is not None:
+                        ready(event)
+                    if not self.inline:
+                        src = self._write_asset(event, index)
+                        if src is not None:
+                            f.write(f'<img src="{src}" alt="Screenshot" loading="lazy" '
+                                    f'decoding="async">'.encode("utf-8"))
+                    elif 'screenshot_bytes' in event:
+                        self._write_img_tag(f, event['screenshot_mime'],
+                                            event['screenshot_bytes'])
+                    elif event.get('screenshot') is not None:
+                        # Legacy PIL path, streamed without a BytesIO copy
+                        self._write_pil_img_tag(f, event['screenshot'])
+                    f.write(b"""
             </div>
-            """
-            html_parts.append(step_html)
+            """)
 
-        html_parts.append(self._build_footer())
-        final_html = "".join(html_parts)
-
-        try:
-            with open(self.output_path, "w", encoding="utf-8") as f:
-                f.write(final_html)
+                f.write(self._build_footer().encode("utf-8"))
+            os.replace(tmp_path, self.output_path)
+            done = True
             logger.info(_("report_saved", path=self.output_path))
-        except Exception as e:
-            logger.error(f"Error saving report: {e}")
+        except OSError as e:
+            logger.error("Error saving report: %s", e)
+        finally:
+            # Any failure (not just OSError) must not leave partial output behind
+            if not done:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if created_assets:
+                    shutil.rmtree(self.assets_dir, ignore_errors=True)
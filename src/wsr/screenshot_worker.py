@@ -33,6 +33,9 @@ class ScreenshotWorker:
         self.engine = screenshot_engine
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.futures: List[Future] = []
+        # id(event) -> (event, future), for waiting on one event's screenshot.
+        # Holding the event keeps its id from being reused while mapped.
+        self._event_futures: dict[int, Tuple[dict, Future]] = {}
         self._shutdown = False
     
     def request_screenshot(
@@ -72,6 +75,7 @@ class ScreenshotWorker:
             image_quality
         )
         self.futures.append(future)
+        self._event_futures[id(event)] = (event, future)
     
     def _do_screenshot(
         self,
@@ -96,10 +100,11 @@ class ScreenshotWorker:
                 quality=image_quality
             )
             if img_bytes:
-                event['screenshot_bytes'] = img_bytes
+                # Mime first: readers test for 'screenshot_bytes' only
                 event['screenshot_mime'] = mime_type
+                event['screenshot_bytes'] = img_bytes
         except Exception as e:
-            logger.error(f"Screenshot capture failed: {e}")
+            logger.error("Screenshot capture failed: %s", e)
     
     def wait_for_pending(self, timeout: float = 5.0) -> int:
         """
@@ -117,9 +122,30 @@ class ScreenshotWorker:
                 future.result(timeout=timeout)
                 completed += 1
             except Exception as e:
-                logger.warning(f"Screenshot future failed: {e}")
+                logger.warning("Screenshot future failed: %s", e)
         self.futures.clear()
+        self._event_futures.clear()
         return completed
+
+    def wait_for_event(self, event: dict, timeout: float = 5.0) -> None:
+        """
+        Wait for the screenshot requested for one event, if any.
+
+        Lets the report writer emit earlier steps while later screenshots
+        are still being captured.
+
+        Args:
+            event: The click event dict passed to request_screenshot()
+            timeout: Maximum seconds to wait
+        """
+        entry = self._event_futures.pop(id(event), None)
+        if entry is None:
+            return
+        future = entry[1]
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.warning("Screenshot future failed: %s", e)
     
     def pending_count(self) -> int:
         """Return number of pending screenshot requests."""
@@ -1,30 +1,102 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import json
-import shutil
-import subprocess
+import signal
+import struct
 import sys
 import os
-import argparse
 import time
 
-# Add package dir to path for imports to work when run as script
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from wsr.i18n import _, init_i18n, _instance
+# ctypes/select (--watch), subprocess/shutil (--toggle) and argparse (any
+# flags) are imported where they are used: the plain status path runs once
+# per Waybar interval and its cost is mostly interpreter start-up plus imports.
+
+# Run via the wsr-waybar entry point or `python -m wsr.waybar_module`
+from wsr import i18n
+from wsr.i18n import _, init_i18n
 
 STATE_FILE = "/tmp/wsr_state.json"
+# Upper bound for one read of the state file; it is far smaller in practice
+_STATE_READ_SIZE = 65536
+# (stat key, parsed state) of the last state file read
+_state_cache = (None, None)
+
+# inotify(7): struct inotify_event header (wd, mask, cookie, len) + name
+_INOTIFY_EVENT = struct.Struct("iIII")
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# --watch: while recording, re-check the PID this often (a killed wsr
+# cannot remove its state file); without inotify, poll at this rate.
+_WATCH_LIVENESS_INTERVAL = 2.0
+_WATCH_POLL_INTERVAL = 1.0
 
 
 def read_state() -> dict | None:
     """Liest State-Datei, gibt None bei Fehler."""
+    # The file is a few hundred bytes: one unbuffered read, no text layer
     try:
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
+        fd = os.open(STATE_FILE, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
         return None
+    try:
+        return json.loads(os.read(fd, _STATE_READ_SIZE))
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
 
 
-def is_pid_alive(pid: int) -> bool:
-    """Prüft ob PID existiert (Signal 0 = nur prüfen)."""
+def _read_state_cached() -> dict | None:
+    """
+    read_state(), skipped while the file is unchanged (for --watch).
+
+    wsr replaces the file by rename, so inode plus mtime identify a version
+    even when two writes land within the same timestamp granularity.
+    """
+    global _state_cache
+    try:
+        st = os.stat(STATE_FILE)
+    except OSError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _state_cache[0] != key:
+        _state_cache = (key, read_state())
+    return _state_cache[1]
+
+
+def proc_start_time(pid: int | str) -> int | None:
+    """Startzeit eines Prozesses in Clock-Ticks seit Boot (/proc/<pid>/stat, Feld 22)."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # comm (field 2) may contain spaces and parentheses; fields resume
+    # after the last ')'
+    try:
+        return int(stat[stat.rindex(b")") + 2:].split()[19])
+    except (ValueError, IndexError):
+        return None
+
+
+def is_pid_alive(pid: int, start_time: int | None = None) -> bool:
+    """
+    Prüft ob PID existiert (Signal 0 = nur prüfen).
+
+    With start_time (as recorded by wsr in the state file), a process that
+    reused the PID after wsr died does not count as alive.
+    """
+    if start_time is not None:
+        current = proc_start_time(pid)
+        if current is not None:
+            return current == start_time
+        # /proc hidden (hidepid) or process gone: let kill() decide
     try:
         os.kill(pid, 0)
         return True
@@ -35,17 +107,22 @@ def is_pid_alive(pid: int) -> bool:
         return False
 
 
+def _remove_stale_state():
+    """Verwaiste State-Datei entfernen."""
+    try:
+        os.unlink(STATE_FILE)
+    except OSError:
+        pass
+
+
 def is_wsr_running() -> tuple[bool, dict | None]:
     """Prüft WSR-Status via State-Datei + PID-Validierung."""
-    state = read_state()
+    state = _read_state_cached()
     if state and "pid" in state:
-        if is_pid_alive(state["pid"]):
+        if is_pid_alive(state["pid"], state.get("pid_start")):
             return True, state
         # Verwaiste State-Datei aufräumen
-        try:
-            os.unlink(STATE_FILE)
-        except OSError:
-            pass
+        _remove_stale_state()
     return False, None
 
 
@@ -89,28 +166,148 @@ def get_status(show_countdown: bool = False, no_blink: bool = False) -> dict:
     }
 
 
+def _inotify_watch(directory: str) -> int | None:
+    """Öffnet einen inotify-Watch auf directory, None wenn nicht verfügbar."""
+    import ctypes
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _state_file_changed(fd: int) -> bool:
+    """Liest alle anstehenden inotify-Events; True wenn STATE_FILE betroffen war."""
+    name = os.fsencode(os.path.basename(STATE_FILE))
+    changed = False
+    while True:
+        try:
+            buf = os.read(fd, 4096)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buf):
+            length = _INOTIFY_EVENT.unpack_from(buf, offset)[3]
+            offset += _INOTIFY_EVENT.size
+            if buf[offset:offset + length].rstrip(b"\0") == name:
+                changed = True
+            offset += length
+
+
+def watch_status(show_countdown: bool = False, no_blink: bool = False):
+    """
+    Prints one JSON line per status change, for a long-running Waybar exec.
+
+    Blocks on inotify events for STATE_FILE instead of being re-run every
+    interval. While idle there are no wakeups at all; while recording the
+    PID is re-checked every few seconds, during a countdown every second.
+    Falls back to polling if inotify is unavailable.
+    """
+    import select
+
+    fd = _inotify_watch(os.path.dirname(STATE_FILE))
+    poller = select.poll()
+    if fd is not None:
+        poller.register(fd, select.POLLIN)
+
+    last = None
+    try:
+        while True:
+            status = get_status(show_countdown=show_countdown, no_blink=no_blink)
+            line = json.dumps(status)
+            if line != last:
+                sys.stdout.write(line + "\n")
+                sys.stdout.flush()
+                last = line
+
+            if fd is None:
+                time.sleep(_WATCH_POLL_INTERVAL)
+                continue
+
+            if status["alt"] == "idle":
+                deadline = None
+            elif status["alt"] == "countdown":
+                deadline = time.monotonic() + 1.0
+            else:
+                deadline = time.monotonic() + _WATCH_LIVENESS_INTERVAL
+
+            # Other files in the state directory wake us too; keep waiting
+            # until STATE_FILE itself changes or the deadline passes.
+            while True:
+                if deadline is None:
+                    timeout = None
+                else:
+                    timeout = max(0, int((deadline - time.monotonic()) * 1000))
+                if not poller.poll(timeout) or _state_file_changed(fd):
+                    break
+    except (BrokenPipeError, KeyboardInterrupt):
+        # Waybar closed the pipe or reloaded
+        pass
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def stop_wsr(pid: int, start_time: int | None = None):
+    """
+    Sends SIGINT to wsr through a pidfd.
+
+    Holding the pidfd pins the process: once the start time has been checked
+    again, the signal cannot reach a process that reused the PID. Without
+    pidfd support (Linux < 5.3) a plain kill() is used.
+    """
+    import subprocess
+
+    try:
+        pidfd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        _remove_stale_state()
+        return
+    except (OSError, AttributeError):
+        pidfd = None
+
+    try:
+        if not is_pid_alive(pid, start_time):
+            _remove_stale_state()
+            return
+        if pidfd is not None:
+            signal.pidfd_send_signal(pidfd, signal.SIGINT)
+        else:
+            os.kill(pid, signal.SIGINT)
+    except PermissionError:
+        # Process belongs to root (started via sudo) – need sudo to signal it
+        subprocess.run(["sudo", "-n", "kill", "-INT", str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except ProcessLookupError:
+        _remove_stale_state()
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
 def toggle_wsr():
     """
     Starts or stops WSR.
     """
+    import shutil
+    import subprocess
+
     running, state = is_wsr_running()
     if running and state:
-        pid = state["pid"]
-        # Try direct kill first, fall back to sudo kill (wsr runs as root)
-        try:
-            os.kill(pid, 2)  # SIGINT = 2
-        except PermissionError:
-            # Process belongs to root (started via sudo) – need sudo to signal it
-            subprocess.run(["sudo", "-n", "kill", "-INT", str(pid)],
-                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except OSError:
-            # Fallback to pkill
-            subprocess.run(["pkill", "-INT", "-f", "wsr.main"])
+        stop_wsr(state["pid"], state.get("pid_start"))
     else:
         wsr_bin = shutil.which("wsr") or "wsr"
         cmd = ["sudo", "-E", wsr_bin]
-        if _instance and _instance.lang:
-            cmd.extend(["--lang", _instance.lang])
+        # Read through the module: init_i18n() rebinds i18n._instance
+        if i18n._instance and i18n._instance.lang:
+            cmd.extend(["--lang", i18n._instance.lang])
         subprocess.Popen(
             cmd,
             stdout=subprocess.DEVNULL,
@@ -120,6 +317,14 @@ def toggle_wsr():
 
 
 def main():
+    if len(sys.argv) == 1:
+        # Plain `"exec": "wsr-waybar"` poll: no flags to parse
+        init_i18n(None)
+        print(json.dumps(get_status()))
+        return
+
+    import argparse
+
     parser = argparse.ArgumentParser(description="WSR Waybar Module Helper")
     parser.add_argument("--toggle", action="store_true", help="Toggle recording state")
     parser.add_argument("--lang", type=str, default=None, help="Language (de, en)")
@@ -127,6 +332,8 @@ def main():
                         help="Disable blink animation class")
     parser.add_argument("--show-countdown", action="store_true",
                         help="Show countdown in module text")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and print a line on every state change")
 
     args = parser.parse_args()
 
@@ -135,6 +342,8 @@ def main():
 
     if args.toggle:
         toggle_wsr()
+    elif args.watch:
+        watch_status(show_countdown=args.show_countdown, no_blink=args.no_blink)
     else:
         # Waybar will use the 'alt' value to pick an icon from 'format-icons'
         status = get_status(
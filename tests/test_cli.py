@@ -1,10 +1,62 @@
+import os
+import tempfile
 import unittest
-from wsr.main import parse_arguments
+from unittest.mock import MagicMock, patch
+from wsr.key_buffer import KeyBuffer
+from wsr.main import parse_arguments, _build_parser, _flush_key_group, _sudo_user_context
 
 class TestCLI(unittest.TestCase):
     def test_import(self):
         """Simple test to ensure src module can be imported."""
         self.assertTrue(True)
 
+    def test_parse_arguments_reuses_parser(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                with patch('sys.argv', ['wsr', '--countdown', '0']):
+                    first = parse_arguments()
+                with patch('sys.argv', ['wsr']):
+                    second = parse_arguments()
+        self.assertEqual(first.countdown, 0)
+        # Config default applies again on the next call with the cached parser
+        self.assertEqual(second.countdown, 3)
+        self.assertIs(_build_parser(), _build_parser())
+
+    def test_parse_arguments_leaves_parser_defaults_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "wsr"))
+            with open(os.path.join(tmp, "wsr", "wsr.yaml"), "w", encoding="utf-8") as f:
+                f.write("countdown: 7\n")
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                with patch('sys.argv', ['wsr']):
+                    args = parse_arguments()
+                with patch('sys.argv', ['wsr', '--countdown', '1']):
+                    overridden = parse_arguments()
+        self.assertEqual(args.countdown, 7)
+        self.assertEqual(overridden.countdown, 1)
+        self.assertEqual(_build_parser().get_default("countdown"), 3)
+
+    def test_flush_key_group(self):
+        buf = KeyBuffer(100)
+        events = []
+        _flush_key_group(buf, events, 1.5)
+        self.assertEqual(events, [])
+        buf.add("KEY_H")
+        buf.add("KEY_I")
+        _flush_key_group(buf, events, 2.5)
+        self.assertEqual(events, [{'type': 'key_group', 'text': 'HI', 'time': 2.5}])
+
+    @patch('pwd.getpwnam')
+    def test_sudo_user_context_cached(self, mock_getpwnam):
+        mock_getpwnam.return_value = MagicMock(pw_uid=1000, pw_gid=1000, pw_dir='/home/alice')
+        _sudo_user_context.cache_clear()
+        self.addCleanup(_sudo_user_context.cache_clear)
+
+        env, _ = _sudo_user_context('alice')
+        self.assertIs(_sudo_user_context('alice')[0], env)
+        mock_getpwnam.assert_called_once_with('alice')
+        self.assertEqual(env['HOME'], '/home/alice')
+        self.assertEqual(env['XDG_RUNTIME_DIR'], '/run/user/1000')
+
 if __name__ == '__main__':
     unittest.main()
@@ -9,10 +9,9 @@ from wsr import config
 
 class TestConfigPaths(unittest.TestCase):
     def test_get_config_dir_uses_xdg_config_home(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
-                dir_path = config.get_config_dir()
-            self.assertEqual(dir_path, os.path.join(tmp, "wsr"))
+        with patch.dict(os.environ, {"XDG_CONFIG_HOME": "/xdg/config"}, clear=False):
+            dir_path = config.get_config_dir()
+        self.assertEqual(dir_path, "/xdg/config/wsr")
 
     def test_get_config_dir_fallback_when_xdg_unset(self):
         with patch.dict(os.environ, {"XDG_CONFIG_HOME": ""}, clear=False):
@@ -21,16 +20,14 @@ class TestConfigPaths(unittest.TestCase):
         self.assertEqual(dir_path, os.path.join(home, ".config", "wsr"))
 
     def test_get_config_dir_strips_whitespace(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp + "  "}, clear=False):
-                dir_path = config.get_config_dir()
-            self.assertEqual(dir_path, os.path.join(tmp.strip(), "wsr"))
+        with patch.dict(os.environ, {"XDG_CONFIG_HOME": "/xdg/config  "}, clear=False):
+            dir_path = config.get_config_dir()
+        self.assertEqual(dir_path, "/xdg/config/wsr")
 
     def test_get_config_path(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
-                path = config.get_config_path()
-            self.assertEqual(path, os.path.join(tmp, "wsr", "wsr.yaml"))
+        with patch.dict(os.environ, {"XDG_CONFIG_HOME": "/xdg/config"}, clear=False):
+            path = config.get_config_path()
+        self.assertEqual(path, "/xdg/config/wsr/wsr.yaml")
 
 
 class TestDefaultConfig(unittest.TestCase):
@@ -38,7 +35,7 @@ class TestDefaultConfig(unittest.TestCase):
         defaults = config.get_default_config()
         expected = {
             "location", "filename_format", "out", "style",
-            "image_format", "image_quality", "cursor", "debug",
+            "image_format", "image_quality", "quantize", "inline_images", "cursor", "debug",
             "capture_window_only", "verbose", "countdown", "no_keys",
             "key_interval", "lang",
         }
@@ -53,6 +50,11 @@ class TestDefaultConfig(unittest.TestCase):
         self.assertFalse(defaults["verbose"])
         self.assertFalse(defaults["no_keys"])
 
+    def test_get_default_config_returns_copy(self):
+        defaults = config.get_default_config()
+        defaults["countdown"] = 99
+        self.assertEqual(config.get_default_config()["countdown"], 3)
+
 
 class TestEnsureAndLoadConfig(unittest.TestCase):
     def test_load_config_creates_file_when_missing(self):
@@ -64,6 +66,15 @@ class TestEnsureAndLoadConfig(unittest.TestCase):
             self.assertEqual(cfg["out"], "output.html")
             self.assertEqual(cfg["countdown"], 3)
 
+    def test_load_config_recreates_deleted_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                config.load_config()
+                path = config.get_config_path()
+                os.unlink(path)
+                config.load_config()
+            self.assertTrue(os.path.isfile(path))
+
     def test_load_config_merges_file_over_defaults(self):
         with tempfile.TemporaryDirectory() as tmp:
             config_dir = os.path.join(tmp, "wsr")
@@ -100,6 +111,63 @@ class TestEnsureAndLoadConfig(unittest.TestCase):
             self.assertEqual(cfg["out"], "output.html")
             self.assertEqual(cfg["countdown"], 3)
 
+    def test_load_config_invalid_yaml_not_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_dir = os.path.join(tmp, "wsr")
+            os.makedirs(config_dir, exist_ok=True)
+            with open(os.path.join(config_dir, "wsr.yaml"), "w", encoding="utf-8") as f:
+                f.write("invalid: yaml: content:\n")
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                with patch("wsr.config.yaml.load", wraps=config.yaml.load) as mock_load:
+                    first = config.load_config()
+                    second = config.load_config()
+            self.assertEqual(mock_load.call_count, 1)
+            self.assertEqual(first, second)
+            self.assertEqual(second["countdown"], 3)
+
+    def test_load_config_empty_file_skips_parse(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_dir = os.path.join(tmp, "wsr")
+            os.makedirs(config_dir, exist_ok=True)
+            open(os.path.join(config_dir, "wsr.yaml"), "w").close()
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                with patch("wsr.config.yaml.load") as mock_load:
+                    cfg = config.load_config()
+            mock_load.assert_not_called()
+            self.assertEqual(cfg["countdown"], 3)
+
+    def test_load_config_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_dir = os.path.join(tmp, "wsr")
+            os.makedirs(config_dir, exist_ok=True)
+            yaml_path = os.path.join(config_dir, "wsr.yaml")
+            with open(yaml_path, "w", encoding="utf-8") as f:
+                f.write("countdown: 10\n")
+            with patch.dict(os.environ, {"XDG_CONFIG_HOME": tmp}, clear=False):
+                with patch("wsr.config.yaml.load", wraps=config.yaml.load) as mock_load:
+                    first = config.load_config()
+                    first["countdown"] = 99  # caller mutation must not leak
+                    second = config.load_config()
+                    self.assertEqual(mock_load.call_count, 1)
+                    self.assertEqual(second["countdown"], 10)
+
+                    with open(yaml_path, "w", encoding="utf-8") as f:
+                        f.write("countdown: 7\n")
+                    st = os.stat(yaml_path)
+                    os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+                    third = config.load_config()
+                    self.assertEqual(mock_load.call_count, 2)
+                    self.assertEqual(third["countdown"], 7)
+
+                    # Same mtime, different size: still re-read
+                    st = os.stat(yaml_path)
+                    with open(yaml_path, "w", encoding="utf-8") as f:
+                        f.write("countdown: 12\n")
+                    os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+                    fourth = config.load_config()
+                    self.assertEqual(mock_load.call_count, 3)
+                    self.assertEqual(fourth["countdown"], 12)
+
 
 class TestResolveOutputPath(unittest.TestCase):
     def test_explicit_out_overrides_everything(self):
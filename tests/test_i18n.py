@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 from wsr.i18n import I18n, init_i18n, _
 
 class TestI18n(unittest.TestCase):
@@ -17,11 +18,37 @@ class TestI18n(unittest.TestCase):
         self.assertEqual(i18n.lang, 'en')
         self.assertEqual(i18n.translate('initializing'), 'Initializing WSR...')
 
+    def test_missing_translation_falls_back_to_english(self):
+        with patch.dict("wsr.i18n._LANG_CACHE", clear=True), \
+                patch("wsr.i18n._read_locale", side_effect=lambda lang: {
+                    "en": {"a": "A (en)", "b": "B (en)"},
+                    "de": {"a": "A (de)"},
+                }.get(lang)):
+            i18n = I18n(lang='de')
+        self.assertEqual(i18n.translate('a'), 'A (de)')
+        self.assertEqual(i18n.translate('b'), 'B (en)')
+        self.assertEqual(i18n.translate('c'), 'c')
+
     def test_formatting(self):
         i18n = I18n(lang='en')
         text = i18n.translate('starting_in', n=5)
         self.assertEqual(text, 'Starting in 5 seconds...')
 
+    def test_translations_cached_per_language(self):
+        first = I18n(lang='de')
+        second = I18n(lang='de')
+        self.assertIs(first.translations, second.translations)
+
+    def test_formatting_missing_key_returns_raw_text(self):
+        i18n = I18n(lang='en')
+        self.assertEqual(i18n.translate('starting_in', m=5), i18n.translations['starting_in'])
+
+    def test_raw_returns_unformatted_template(self):
+        i18n = I18n(lang='en')
+        self.assertEqual(i18n.raw('starting_in'), 'Starting in {n} seconds...')
+        self.assertEqual(i18n.raw('starting_in').format(n=5), i18n.translate('starting_in', n=5))
+        self.assertEqual(i18n.raw('no_such_key'), 'no_such_key')
+
     def test_global_helper(self):
         init_i18n('de')
         self.assertEqual(_('initializing'), 'Initialisiere WSR...')
@@ -1,30 +1,66 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
+import types
 
-# Mock evdev module since it might not be installed in the test environment
-sys.modules['evdev'] = MagicMock()
-sys.modules['evdev.ecodes'] = MagicMock()
-# Setup some constants usually found in ecodes
-sys.modules['evdev'].ecodes.EV_REL = 2
-sys.modules['evdev'].ecodes.EV_KEY = 1
-sys.modules['evdev'].ecodes.REL_X = 0
-sys.modules['evdev'].ecodes.REL_Y = 1
-sys.modules['evdev'].ecodes.BTN_LEFT = 272
-sys.modules['evdev'].ecodes.BTN_RIGHT = 273
-sys.modules['evdev'].ecodes.BTN_MIDDLE = 274
-sys.modules['evdev'].ecodes.KEY_A = 30
-sys.modules['evdev'].ecodes.KEY = {30: 'KEY_A'}
-sys.modules['evdev'].ecodes.BTN = {272: 'BTN_LEFT', 273: 'BTN_RIGHT', 274: 'BTN_MIDDLE'}
+# Fake evdev module since it might not be installed in the test environment.
+# A plain module with the constants input_manager reads: unlike a MagicMock,
+# a missing attribute fails loudly instead of yielding a mock.
+class _FakeEcodes:
+    EV_KEY = 1
+    EV_REL = 2
+    REL_X = 0
+    REL_Y = 1
+    BTN_LEFT = 272
+    BTN_RIGHT = 273
+    BTN_MIDDLE = 274
+    KEY_A = 30
+    KEY = {30: 'KEY_A'}
+    BTN = {272: 'BTN_LEFT', 273: 'BTN_RIGHT', 274: 'BTN_MIDDLE'}
+
+
+_fake_evdev = types.ModuleType("evdev")
+_fake_evdev.ecodes = _FakeEcodes
+_fake_evdev.list_devices = lambda: []
+_fake_evdev.InputDevice = MagicMock()
+sys.modules['evdev'] = _fake_evdev
+sys.modules['evdev.ecodes'] = _FakeEcodes
 
 # Now import the module to test
+from wsr import input_manager
 from wsr.input_manager import InputManager
 
 
+def _decode(mgr, *events):
+    """Runs (sec, usec, type, code, value) tuples through the device read path."""
+    buf = b"".join(input_manager._INPUT_EVENT.pack(*e) for e in events)
+    return mgr._decode_events(MagicMock(), input_manager._INPUT_EVENT.iter_unpack(buf))
+
+
 class TestInputManager(unittest.TestCase):
     def setUp(self):
         self.cursor_fn = MagicMock(return_value=(100, 200))
         self.mgr = InputManager(cursor_position_fn=self.cursor_fn)
+        self.addCleanup(self.mgr.stop)
+        input_manager._CAPS_CACHE.clear()
+        # Point the sysfs prefilter at an empty tree so the host's real
+        # /sys/class/input never leaks into the mocked device scans
+        self._sysfs = tempfile.TemporaryDirectory()
+        self.addCleanup(self._sysfs.cleanup)
+        patcher = patch.object(input_manager, '_SYSFS_INPUT', self._sysfs.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write_sysfs_caps(self, ev_name, ev, key=None):
+        caps_dir = os.path.join(self._sysfs.name, ev_name, 'device', 'capabilities')
+        os.makedirs(caps_dir)
+        with open(os.path.join(caps_dir, 'ev'), 'w') as f:
+            f.write(ev + '\n')
+        if key is not None:
+            with open(os.path.join(caps_dir, 'key'), 'w') as f:
+                f.write(key + '\n')
 
     @patch('wsr.input_manager.evdev.list_devices')
     @patch('wsr.input_manager.evdev.InputDevice')
@@ -45,37 +81,84 @@ class TestInputManager(unittest.TestCase):
         # Should be identified as both mouse and keyboard based on current loose logic
         self.assertEqual(len(self.mgr.mouse_devices), 1)
         self.assertEqual(len(self.mgr.keyboard_devices), 1)
+        # Combo device is listened on once, not twice
+        self.assertEqual(self.mgr.devices, [mock_dev])
+
+    @patch('wsr.input_manager.os.stat')
+    @patch('wsr.input_manager.evdev.list_devices')
+    @patch('wsr.input_manager.evdev.InputDevice')
+    def test_find_devices_caches_capabilities(self, mock_input_device,
+                                              mock_list_devices, mock_stat):
+        """Unchanged device nodes are not re-probed on a second scan."""
+        mock_list_devices.return_value = ['/dev/input/event0', '/dev/input/event1']
+        mock_stat.return_value = MagicMock(st_mtime_ns=42)
+
+        mouse = MagicMock()
+        mouse.capabilities.return_value = {sys.modules['evdev'].ecodes.EV_REL: [0, 1]}
+        power_button = MagicMock()
+        power_button.capabilities.return_value = {sys.modules['evdev'].ecodes.EV_KEY: [116]}
+        mock_input_device.side_effect = [mouse, power_button, mouse]
+
+        self.mgr.find_devices()
+        self.mgr.find_devices()
+
+        # Second scan reopens the mouse only; the power button is skipped
+        self.assertEqual(mock_input_device.call_count, 3)
+        mouse.capabilities.assert_called_once()
+        power_button.close.assert_called_once()
+        self.assertEqual(self.mgr.mouse_devices, [mouse])
+        self.assertEqual(self.mgr.keyboard_devices, [])
+
+    @patch('wsr.input_manager.evdev.list_devices')
+    @patch('wsr.input_manager.evdev.InputDevice')
+    def test_find_devices_skips_nodes_ruled_out_by_sysfs(self, mock_input_device,
+                                                        mock_list_devices):
+        """Nodes without a keyboard or mouse bit in sysfs are never opened."""
+        mock_list_devices.return_value = ['/dev/input/event0', '/dev/input/event1']
+        # event0: power button (EV_KEY, but no KEY_A); event1: keyboard
+        self._write_sysfs_caps('event0', '3', key='100000 0 0 0')
+        self._write_sysfs_caps('event1', '120013', key='fffffffffffffffe')
+
+        keyboard = MagicMock()
+        keyboard.capabilities.return_value = {sys.modules['evdev'].ecodes.EV_KEY: [30]}
+        mock_input_device.return_value = keyboard
+
+        self.mgr.find_devices()
+
+        mock_input_device.assert_called_once_with('/dev/input/event1')
+        self.assertEqual(self.mgr.keyboard_devices, [keyboard])
+
+    def test_sysfs_classify(self):
+        # No sysfs entry: caller must fall back to opening the device
+        self.assertIsNone(input_manager._sysfs_classify('/dev/input/event2'))
+
+        self._write_sysfs_caps('event3', '7', key='70000 0 0 0 0')  # mouse buttons only
+        self.assertEqual(input_manager._sysfs_classify('/dev/input/event3'), (True, False))
 
     def test_click_uses_cursor_position_fn(self):
         """Test that click events use the cursor_position_fn callback."""
-        mock_event = MagicMock()
-        mock_event.type = sys.modules['evdev'].ecodes.EV_KEY
-        mock_event.code = sys.modules['evdev'].ecodes.BTN_LEFT
-        mock_event.value = 1  # Key down
-
-        self.mgr._handle_event(MagicMock(), mock_event)
+        ecodes = sys.modules['evdev'].ecodes
+        # Key down
+        events = _decode(self.mgr, (1700000000, 250000, ecodes.EV_KEY, ecodes.BTN_LEFT, 1))
 
         # cursor_position_fn should have been called
         self.cursor_fn.assert_called_once()
 
-        # Check event was put in queue with correct coordinates
-        event = self.mgr.event_queue.get_nowait()
+        # Check event was decoded with correct coordinates
+        event, = events
         self.assertEqual(event['type'], 'click')
+        self.assertEqual(event['button'], 'BTN_LEFT')
         self.assertEqual(event['x'], 100)
         self.assertEqual(event['y'], 200)
+        # Kernel timestamp of the input event, not the dequeue time
+        self.assertEqual(event['time'], 1700000000.25)
 
     def test_click_with_no_cursor_fn(self):
         """Test that click events work without cursor_position_fn (fallback to 0,0)."""
         mgr_no_fn = InputManager(cursor_position_fn=None)
+        ecodes = sys.modules['evdev'].ecodes
 
-        mock_event = MagicMock()
-        mock_event.type = sys.modules['evdev'].ecodes.EV_KEY
-        mock_event.code = sys.modules['evdev'].ecodes.BTN_LEFT
-        mock_event.value = 1
-
-        mgr_no_fn._handle_event(MagicMock(), mock_event)
-
-        event = mgr_no_fn.event_queue.get_nowait()
+        event, = _decode(mgr_no_fn, (0, 0, ecodes.EV_KEY, ecodes.BTN_LEFT, 1))
         self.assertEqual(event['x'], 0)
         self.assertEqual(event['y'], 0)
 
@@ -83,18 +166,123 @@ class TestInputManager(unittest.TestCase):
         """Test fallback when cursor_position_fn returns None."""
         failing_fn = MagicMock(return_value=None)
         mgr = InputManager(cursor_position_fn=failing_fn)
+        ecodes = sys.modules['evdev'].ecodes
 
-        mock_event = MagicMock()
-        mock_event.type = sys.modules['evdev'].ecodes.EV_KEY
-        mock_event.code = sys.modules['evdev'].ecodes.BTN_LEFT
-        mock_event.value = 1
-
-        mgr._handle_event(MagicMock(), mock_event)
-
-        event = mgr.event_queue.get_nowait()
+        event, = _decode(mgr, (0, 0, ecodes.EV_KEY, ecodes.BTN_LEFT, 1))
         self.assertEqual(event['x'], 0)
         self.assertEqual(event['y'], 0)
 
+    def test_decode_events_skips_non_key_events(self):
+        """A batch only yields key-down events; SYN/REL/key-up are dropped."""
+        ecodes = sys.modules['evdev'].ecodes
+
+        events = _decode(
+            self.mgr,
+            (0, 0, 0, 0, 0),                            # EV_SYN
+            (0, 0, ecodes.EV_REL, ecodes.REL_X, 5),     # motion
+            (0, 0, ecodes.EV_KEY, ecodes.KEY_A, 1),     # key down
+            (0, 0, ecodes.EV_KEY, ecodes.KEY_A, 0),     # key up
+            (0, 0, ecodes.EV_KEY, ecodes.BTN_LEFT, 1),  # click
+            (0, 0, 0, 0, 0),                            # EV_SYN
+        )
+
+        etypes = [e['type'] for e in events]
+        self.assertEqual(etypes, ['key', 'click'])
+
+    def test_name_map_picks_first_alias(self):
+        """Aliased ecodes entries resolve to a single name string."""
+        names = input_manager._name_map({272: ('BTN_LEFT', 'BTN_MOUSE'), 30: 'KEY_A'})
+        self.assertEqual(names, {272: 'BTN_LEFT', 30: 'KEY_A'})
+
+    def test_uses_slots(self):
+        """Attributes live in slots; typos fail loudly instead of adding state."""
+        self.assertFalse(hasattr(self.mgr, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.mgr.log_key = False
+
+    def test_event_wakes_consumer(self):
+        """Queued events signal wait_for_events() without polling."""
+        ecodes = sys.modules['evdev'].ecodes
+
+        self.mgr._open_wake_pipe()
+        self.assertFalse(self.mgr.wait_for_events(0))
+        self.mgr._enqueue(_decode(self.mgr, (0, 0, ecodes.EV_KEY, ecodes.BTN_LEFT, 1)))
+        self.assertTrue(self.mgr.wait_for_events(0))
+        self.assertEqual(len(self.mgr.event_queue), 1)
+
+    def test_wake_interrupts_wait(self):
+        """wake() (e.g. from a signal handler) ends a blocking wait early."""
+        self.mgr._open_wake_pipe()
+        self.mgr.wake()
+        self.mgr.wake()
+        self.assertTrue(self.mgr.wait_for_events(None))
+        # Coalesced: both wake-ups are consumed by a single wait
+        self.assertFalse(self.mgr.wait_for_events(0))
+
+    def test_wake_after_stop_is_noop(self):
+        self.mgr._open_wake_pipe()
+        self.mgr.stop()
+        self.mgr.wake()
+
+    def test_wake_pipe_opened_by_start_only(self):
+        """No fds are held before start(), and waits return at once after stop()."""
+        self.assertIsNone(self.mgr._wake_pipe)
+        self.assertFalse(self.mgr.wait_for_events(None))
+        self.mgr._open_wake_pipe()
+        self.mgr.stop()
+        self.assertIsNone(self.mgr._wake_pipe)
+        self.assertFalse(self.mgr.wait_for_events(None))
+
+    def test_drain_events_returns_batch_in_order(self):
+        self.mgr._enqueue([{'type': 'key', 'key': 'KEY_A'}, {'type': 'key', 'key': 'KEY_B'}])
+        self.assertEqual([e['key'] for e in self.mgr.drain_events()], ['KEY_A', 'KEY_B'])
+        self.assertEqual(self.mgr.drain_events(), [])
+
+    def test_listener_thread_reads_and_stops(self):
+        """The epoll listener dispatches readable devices and exits on stop()."""
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+
+        dev = MagicMock()
+        dev.fileno.return_value = r
+        self.mgr.devices = [dev]
+
+        self.mgr.start()
+        ecodes = sys.modules['evdev'].ecodes
+        os.write(w, input_manager._INPUT_EVENT.pack(0, 0, ecodes.EV_KEY, ecodes.KEY_A, 1))
+        self.assertTrue(self.mgr.wait_for_events(2.0))
+        self.mgr.stop()
+
+        self.assertFalse(self.mgr.thread.is_alive())
+        self.assertEqual(self.mgr.event_queue.popleft()['type'], 'key')
+
+    def test_poll_without_thread(self):
+        """poll() can be driven directly, without the listener thread."""
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+
+        dev = MagicMock()
+        dev.fileno.return_value = r
+        self.mgr.devices = [dev]
+
+        self.assertEqual(self.mgr.poll(timeout=0), [])
+        # One read returns a whole batch of kernel input_event records
+        ecodes = sys.modules['evdev'].ecodes
+        pack = input_manager._INPUT_EVENT.pack
+        os.write(w, b"".join([
+            pack(1700000000, 500000, ecodes.EV_REL, ecodes.REL_X, 3),
+            pack(1700000000, 500000, ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+            pack(1700000000, 500000, 0, 0, 0),
+        ]))
+        events = self.mgr.poll(timeout=1.0)
+        self.mgr.stop()
+
+        self.assertEqual([e['type'] for e in events], ['click'])
+        self.assertEqual(events[0]['time'], 1700000000.5)
+        self.assertEqual(len(self.mgr.event_queue), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
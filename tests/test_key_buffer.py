@@ -1,10 +1,33 @@
 import unittest
-import time
 import threading
+from unittest.mock import patch
 from wsr.key_buffer import KeyBuffer
 
 
-class TestKeyBuffer(unittest.TestCase):
+class FakeClock:
+    """Stands in for time.monotonic; tests advance it instead of sleeping."""
+
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+
+
+class ClockTestCase(unittest.TestCase):
+    """Runs each test with wsr.key_buffer's clock replaced by a FakeClock."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("wsr.key_buffer._now", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestKeyBuffer(ClockTestCase):
     """Original tests - Happy Path."""
 
     def test_grouping(self):
@@ -17,7 +40,7 @@ class TestKeyBuffer(unittest.TestCase):
     def test_timeout(self):
         buf = KeyBuffer(10)  # 10ms
         buf.add("KEY_A")
-        time.sleep(0.02)
+        self.clock.advance(0.02)
         self.assertTrue(buf.is_timed_out())
         self.assertEqual(buf.flush(), "A")
 
@@ -29,7 +52,7 @@ class TestKeyBuffer(unittest.TestCase):
         self.assertEqual(buf.flush(), " \nB")
 
 
-class TestKeyBufferIntervalEdgeCases(unittest.TestCase):
+class TestKeyBufferIntervalEdgeCases(ClockTestCase):
     """Tests for interval_ms edge cases."""
 
     def test_interval_zero(self):
@@ -37,8 +60,8 @@ class TestKeyBufferIntervalEdgeCases(unittest.TestCase):
         buf = KeyBuffer(0)
         buf.add("KEY_A")
         # Second key should return False (needs flush)
-        # because (now - last_time) > 0.0 (almost always)
-        time.sleep(0.001)
+        # because (now - last_time) > 0.0
+        self.clock.advance(0.001)
         self.assertFalse(buf.add("KEY_B"))
 
     def test_interval_negative(self):
@@ -54,14 +77,14 @@ class TestKeyBufferIntervalEdgeCases(unittest.TestCase):
         self.assertEqual(buf.flush(), "AB")
 
 
-class TestKeyBufferTimingEdgeCases(unittest.TestCase):
+class TestKeyBufferTimingEdgeCases(ClockTestCase):
     """Tests for timing boundary conditions."""
 
     def test_exact_interval_boundary(self):
         """Keys at exactly the interval boundary (<=)."""
         buf = KeyBuffer(100)  # 100ms
         buf.add("KEY_A")
-        time.sleep(0.095)  # Just under 100ms
+        self.clock.advance(0.095)  # Just under 100ms
         self.assertTrue(buf.add("KEY_B"))
         self.assertEqual(buf.flush(), "AB")
 
@@ -69,7 +92,7 @@ class TestKeyBufferTimingEdgeCases(unittest.TestCase):
         """Keys just over the interval should trigger flush need."""
         buf = KeyBuffer(50)  # 50ms
         buf.add("KEY_A")
-        time.sleep(0.06)  # 60ms - over 50ms
+        self.clock.advance(0.06)  # 60ms - over 50ms
         self.assertFalse(buf.add("KEY_B"))
 
     def test_rapid_keys_same_timestamp(self):
@@ -107,6 +130,16 @@ class TestKeyBufferMappingEdgeCases(unittest.TestCase):
         self.assertIn("[CAPSLOCK]", result)
         self.assertIn("[F12]", result)
 
+    def test_map_key_digits(self):
+        """Digit keys map to the bare digit, like letters."""
+        self.assertEqual(KeyBuffer._map_key("KEY_7"), "7")
+        self.assertEqual(KeyBuffer._map_key("KEY_KP7"), "[KP7]")
+
+    def test_map_key_reuses_bracketed_names(self):
+        """Repeated special keys return the same cached str object."""
+        first = KeyBuffer._map_key("KEY_LEFTCTRL")
+        self.assertIs(KeyBuffer._map_key("KEY_LEFTCTRL"), first)
+
     def test_map_key_backspace(self):
         """Backspace should map to unicode symbol."""
         buf = KeyBuffer(100)
@@ -123,7 +156,7 @@ class TestKeyBufferMappingEdgeCases(unittest.TestCase):
         self.assertEqual(result, "A⌫\n")
 
 
-class TestKeyBufferStateEdgeCases(unittest.TestCase):
+class TestKeyBufferStateEdgeCases(ClockTestCase):
     """Tests for buffer state edge cases."""
 
     def test_flush_empty_buffer(self):
@@ -142,9 +175,70 @@ class TestKeyBufferStateEdgeCases(unittest.TestCase):
         """Empty buffer should never be timed out."""
         buf = KeyBuffer(1)  # 1ms
         self.assertFalse(buf.is_timed_out())
-        time.sleep(0.01)
+        self.clock.advance(0.01)
         self.assertFalse(buf.is_timed_out())
 
+    def test_next_deadline(self):
+        """Deadline is None when empty, last key time + interval otherwise."""
+        buf = KeyBuffer(100)
+        self.assertIsNone(buf.next_deadline())
+        buf.add("KEY_A")
+        self.assertAlmostEqual(buf.next_deadline(), buf.last_time + 0.1)
+        buf.flush()
+        self.assertIsNone(buf.next_deadline())
+
+    def test_injected_now(self):
+        """Callers can pass a cached monotonic timestamp instead of re-reading the clock."""
+        buf = KeyBuffer(100)
+        self.assertTrue(buf.add("KEY_A", now=10.0))
+        self.assertTrue(buf.add("KEY_B", now=10.05))
+        self.assertFalse(buf.is_timed_out(now=10.1))
+        self.assertTrue(buf.is_timed_out(now=10.2))
+        self.assertFalse(buf.add("KEY_C", now=10.2))
+        self.assertEqual(buf.flush(), "AB")
+
+    def test_threshold_adapts_to_typing_speed(self):
+        """Steady fast typing shrinks the timeout below the configured interval."""
+        buf = KeyBuffer(500)
+        t = 0.0
+        for _ in range(30):
+            self.assertTrue(buf.add("KEY_A", now=t))
+            t += 0.05
+        self.assertLess(buf.threshold, 0.2)
+        self.assertGreaterEqual(buf.threshold, 0.1)
+        self.assertAlmostEqual(buf.next_deadline(), buf.last_time + buf.threshold)
+        self.assertTrue(buf.is_timed_out(now=buf.last_time + 0.25))
+
+    def test_threshold_recovers_after_fast_burst(self):
+        """A fast burst must not pin the timeout below a slower typing rhythm."""
+        buf = KeyBuffer(500)
+        t = 0.0
+        for _ in range(20):
+            buf.add("KEY_A", now=t)
+            t += 0.04
+        self.assertLess(buf.threshold, 0.19)
+        buf.flush()
+
+        # Steady typing at 190 ms, flushing whenever a key is rejected
+        groups = 0
+        for _ in range(20):
+            t += 0.19
+            if not buf.add("KEY_B", now=t):
+                buf.flush()
+                groups += 1
+                buf.add("KEY_B", now=t)
+        self.assertGreater(buf.threshold, 0.19)
+        self.assertTrue(buf.add("KEY_C", now=t + 0.19))
+        self.assertLessEqual(groups, 2)
+
+    def test_threshold_capped_at_interval(self):
+        """Slow typing never stretches the timeout past the configured interval."""
+        buf = KeyBuffer(100)
+        buf.add("KEY_A", now=0.0)
+        buf.add("KEY_B", now=0.09)
+        buf.add("KEY_C", now=0.18)
+        self.assertEqual(buf.threshold, 0.1)
+
     def test_flush_resets_state(self):
         """After flush, buffer should be empty and ready for new keys."""
         buf = KeyBuffer(100)
@@ -171,19 +265,24 @@ class TestKeyBufferThreadSafety(unittest.TestCase):
         """Concurrent add and flush should not crash."""
         buf = KeyBuffer(100)
         errors = []
+        start = threading.Barrier(2)
+        adder_done = threading.Event()
 
         def adder():
             try:
-                for _ in range(1000):
+                start.wait()
+                for _ in range(10000):
                     buf.add("KEY_A")
             except Exception as e:
                 errors.append(e)
+            finally:
+                adder_done.set()
 
         def flusher():
             try:
-                for _ in range(100):
+                start.wait()
+                while not adder_done.is_set():
                     buf.flush()
-                    time.sleep(0.001)
             except Exception as e:
                 errors.append(e)
 
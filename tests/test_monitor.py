@@ -1,3 +1,8 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 import time
@@ -9,6 +14,8 @@ class TestMonitorManager(unittest.TestCase):
         with patch('wsr.monitor_manager.subprocess.run') as mock_run:
             mock_run.return_value = MagicMock(returncode=1)
             self.mgr = MonitorManager()
+        # Keep tests off a real Hyprland session's socket
+        self.mgr._sock_path = None
         # Mock monitor setup
         self.mgr.monitors = [
             {'name': 'eDP-1', 'x': 0, 'y': 0, 'width': 1920, 'height': 1080},
@@ -24,6 +31,38 @@ class TestMonitorManager(unittest.TestCase):
         self.assertEqual(self.mgr.get_relative_coordinates(2000, 500, 'DP-1'), (80, 500))
         self.assertEqual(self.mgr.get_relative_coordinates(500, 500, 'eDP-1'), (500, 500))
 
+    def test_get_monitor_at_remembers_last_hit(self):
+        self.assertEqual(self.mgr.get_monitor_at(2000, 500), 'DP-1')
+        self.assertEqual(self.mgr._last, (1920, 0, 4480, 1440, 'DP-1'))
+        self.assertEqual(self.mgr.get_monitor_at(2100, 600), 'DP-1')
+        # A miss on the cached rect still finds the other monitor
+        self.assertEqual(self.mgr.get_monitor_at(10, 10), 'eDP-1')
+
+    def test_replacing_monitors_resets_index(self):
+        self.mgr.get_monitor_at(2000, 500)
+        self.mgr.monitors = [{'name': 'HDMI-A-1', 'x': 0, 'y': 0, 'width': 3840, 'height': 2160}]
+        self.assertEqual(self.mgr.get_monitor_at(2000, 500), 'HDMI-A-1')
+        self.assertEqual(self.mgr.get_relative_coordinates(2000, 500, 'DP-1'), (2000, 500))
+
+    def test_grid_lookup_with_offsets_and_unaligned_edges(self):
+        # Negative origin and an edge that does not fall on a cell boundary
+        self.mgr.monitors = [
+            {'name': 'left', 'x': -1000, 'y': 0, 'width': 1000, 'height': 800},
+            {'name': 'mid', 'x': 0, 'y': 0, 'width': 1366, 'height': 768},
+            {'name': 'right', 'x': 1366, 'y': 100, 'width': 1920, 'height': 1080},
+        ]
+        self.mgr._last_refresh = time.time()
+        self.assertEqual(self.mgr.get_monitor_at(-1, 0), 'left')
+        self.assertEqual(self.mgr.get_monitor_at(1365, 500), 'mid')
+        self.assertEqual(self.mgr.get_monitor_at(1366, 500), 'right')
+        self.assertIsNone(self.mgr.get_monitor_at(1300, 790))
+        self.assertIsNone(self.mgr.get_monitor_at(1400, 50))
+
+    def test_get_virtual_desktop_size(self):
+        self.assertEqual(self.mgr.get_virtual_desktop_size(), (4480, 1440))
+        self.mgr.monitors = []
+        self.assertEqual(self.mgr.get_virtual_desktop_size(), (0, 0))
+
     @patch('wsr.monitor_manager.subprocess.run')
     def test_get_cursor_position_success(self, mock_run):
         """Test get_cursor_position parses hyprctl output correctly."""
@@ -60,6 +99,84 @@ class TestMonitorManager(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestMonitorManagerIPC(unittest.TestCase):
+    """Tests for queries over the Hyprland IPC socket."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.sock_path = os.path.join(self.tmpdir, ".socket.sock")
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(self.server.close)
+        self.server.bind(self.sock_path)
+        self.server.listen(4)
+        self.requests = []
+        with patch('wsr.monitor_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(returncode=1)
+            self.mgr = MonitorManager()
+        self.mgr._sock_path = self.sock_path
+
+    def _serve(self, replies):
+        """Answers one connection per reply, like Hyprland does."""
+        def run():
+            for reply in replies:
+                conn, _ = self.server.accept()
+                with conn:
+                    self.requests.append(conn.recv(1024).decode())
+                    conn.sendall(reply.encode())
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 1.0)
+
+    @patch('wsr.monitor_manager.subprocess.run')
+    def test_cursor_position_via_socket(self, mock_run):
+        self._serve(["1905, 492"])
+        self.assertEqual(self.mgr.get_cursor_position(), (1905, 492))
+        self.assertEqual(self.requests, ["cursorpos"])
+        mock_run.assert_not_called()
+
+    @patch('wsr.monitor_manager.subprocess.run')
+    def test_refresh_batches_cursor_query(self, mock_run):
+        self._serve(['[{"name": "DP-1", "x": 0, "y": 0, "width": 2560, "height": 1440}]'
+                     '\n\n\n300, 400\n'])
+        self.mgr.refresh()
+        self.assertEqual(self.requests, ["[[BATCH]]j/monitors;cursorpos"])
+        self.assertEqual(self.mgr.get_monitor_at(100, 100), 'DP-1')
+        # The batched cursor answer is served without another round-trip
+        self.assertEqual(self.mgr.get_cursor_position(), (300, 400))
+        self.assertEqual(len(self.requests), 1)
+        mock_run.assert_not_called()
+
+    def test_cursor_cache_expires(self):
+        self._serve(["1, 2", "3, 4"])
+        self.assertEqual(self.mgr.get_cursor_position(), (1, 2))
+        self.assertEqual(self.mgr.get_cursor_position(), (1, 2))
+        ts, pos = self.mgr._cursor_cache
+        self.mgr._cursor_cache = (ts - 1.0, pos)
+        self.assertEqual(self.mgr.get_cursor_position(), (3, 4))
+        self.assertEqual(self.requests, ["cursorpos", "cursorpos"])
+
+    @patch('wsr.monitor_manager.subprocess.run')
+    def test_falls_back_to_hyprctl_when_socket_fails(self, mock_run):
+        self.server.close()
+        os.unlink(self.sock_path)
+        mock_run.return_value = MagicMock(returncode=0, stdout="10, 20\n")
+        self.assertEqual(self.mgr.get_cursor_position(), (10, 20))
+        mock_run.assert_called_once()
+
+    def test_socket_path_requires_signature(self):
+        from wsr.monitor_manager import _hypr_socket_path
+        with patch.dict(os.environ):
+            os.environ.pop('HYPRLAND_INSTANCE_SIGNATURE', None)
+            self.assertIsNone(_hypr_socket_path())
+        sig_dir = os.path.join(self.tmpdir, 'hypr', 'abc')
+        os.makedirs(sig_dir)
+        open(os.path.join(sig_dir, '.socket.sock'), 'w').close()
+        with patch.dict(os.environ, {'HYPRLAND_INSTANCE_SIGNATURE': 'abc',
+                                     'XDG_RUNTIME_DIR': self.tmpdir}):
+            self.assertEqual(_hypr_socket_path(), os.path.join(sig_dir, '.socket.sock'))
+
+
 class TestMonitorManagerLazyRefresh(unittest.TestCase):
     """Tests for lazy refresh and throttling behavior."""
 
@@ -67,6 +184,7 @@ class TestMonitorManagerLazyRefresh(unittest.TestCase):
         with patch('wsr.monitor_manager.subprocess.run') as mock_run:
             mock_run.return_value = MagicMock(returncode=1)
             self.mgr = MonitorManager()
+        self.mgr._sock_path = None
         self.mgr.monitors = [
             {'name': 'eDP-1', 'x': 0, 'y': 0, 'width': 1920, 'height': 1080},
         ]
@@ -5,13 +5,15 @@ import os
 import tempfile
 
 class TestReportGenerator(unittest.TestCase):
-    def test_img_to_base64(self):
-        gen = ReportGenerator("dummy.html")
-        # _img_to_base64 now expects an event dict, not a raw Image
-        img = Image.new("RGB", (10, 10), "red")
-        event = {'screenshot': img}
-        b64 = gen._img_to_base64(event)
-        self.assertTrue(b64.startswith("data:image/png;base64,"))
+    def test_custom_css(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            css_path = os.path.join(tmp, "style.css")
+            with open(css_path, "w") as f:
+                f.write("body { color: red; }")
+            self.assertEqual(ReportGenerator("out.html", custom_style_path=css_path).custom_css,
+                             "body { color: red; }")
+            self.assertIsNone(ReportGenerator("out.html", custom_style_path=os.path.join(tmp, "missing.css")).custom_css)
+            self.assertIsNone(ReportGenerator("out.html", custom_style_path=tmp).custom_css)
 
     def test_generate_report(self):
         with tempfile.NamedTemporaryFile(suffix=".html", delete=False) as tmp:
@@ -38,5 +40,113 @@ class TestReportGenerator(unittest.TestCase):
             if os.path.exists(output_path):
                 os.remove(output_path)
 
+    def test_generate_time_matches_datetime_format(self):
+        from datetime import datetime
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            stamps = [1600000000.25, 1600003599.999, 1600086399.5]
+            ReportGenerator(output_path).generate(
+                [{'type': 'key', 'key': 'KEY_A', 'time': t} for t in stamps])
+            with open(output_path, "r") as f:
+                content = f.read()
+            for t in stamps:
+                expected = datetime.fromtimestamp(t).strftime('%H:%M:%S.%f')[:-3]
+                self.assertIn(f'<div class="meta">{expected}</div>', content)
+
+    def test_generate_escapes_typed_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            ReportGenerator(output_path).generate([
+                {'type': 'key_group', 'text': '<script>alert(1)</script>&', 'time': 1600000000},
+            ])
+            with open(output_path, "r") as f:
+                content = f.read()
+            self.assertNotIn("<script>alert(1)", content)
+            self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;&amp;", content)
+
+    def test_generate_waits_per_event_via_ready(self):
+        """ready() runs before each step, so late screenshots still land."""
+        seen = []
+
+        def ready(event):
+            seen.append(event['type'])
+            if event['type'] == 'click':
+                event['screenshot_mime'] = 'image/webp'
+                event['screenshot_bytes'] = b'late'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            ReportGenerator(output_path).generate([
+                {'type': 'key', 'key': 'KEY_A', 'time': 1600000000},
+                {'type': 'click', 'button': 'BTN_LEFT', 'x': 1, 'y': 2, 'time': 1600000001},
+            ], ready=ready)
+            with open(output_path, "r") as f:
+                content = f.read()
+        self.assertEqual(seen, ['key', 'click'])
+        self.assertIn("data:image/webp;base64,bGF0ZQ==", content)
+
+    def test_generate_writes_sidecar_assets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            ReportGenerator(output_path, inline=False).generate([
+                {'type': 'key', 'key': 'KEY_A', 'time': 1600000000},
+                {'type': 'click', 'button': 'BTN_LEFT', 'x': 1, 'y': 2, 'time': 1600000001,
+                 'screenshot_bytes': b'webpdata', 'screenshot_mime': 'image/webp'},
+            ])
+            with open(output_path, "r") as f:
+                content = f.read()
+            with open(os.path.join(tmp, "report_assets", "0001.webp"), "rb") as f:
+                self.assertEqual(f.read(), b'webpdata')
+        self.assertIn('<img src="report_assets/0001.webp" alt="Screenshot" loading="lazy"', content)
+        self.assertNotIn("base64,", content)
+
+    def test_generate_cleans_up_on_malformed_event(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            with self.assertRaises(KeyError):
+                ReportGenerator(output_path, inline=False).generate([
+                    {'type': 'click', 'button': 'BTN_LEFT', 'x': 1, 'y': 2, 'time': 1600000000,
+                     'screenshot_bytes': b'webpdata', 'screenshot_mime': 'image/webp'},
+                    {'time': 1600000001},
+                ])
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_generate_streams_large_screenshot(self):
+        """Chunked base64 output matches a one-shot encode; no temp file remains."""
+        import base64
+        from wsr import report_generator
+
+        data = os.urandom(report_generator._B64_CHUNK * 2 + 7)
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            gen = ReportGenerator(output_path)
+            gen.generate([{'type': 'click', 'button': 'BTN_LEFT', 'x': 1, 'y': 2,
+                           'time': 1600000000, 'screenshot_bytes': data,
+                           'screenshot_mime': 'image/webp'}])
+
+            with open(output_path, "r") as f:
+                content = f.read()
+            self.assertIn("data:image/webp;base64," + base64.b64encode(data).decode(), content)
+            self.assertEqual(os.listdir(tmp), ["report.html"])
+
+    def test_generate_streams_pil_screenshot(self):
+        """Legacy PIL screenshots stream to the same data URI as a one-shot encode."""
+        import base64
+        from wsr import report_generator
+
+        # Noise keeps the PNG larger than one base64 slice
+        img = Image.frombytes("RGB", (256, 256), os.urandom(256 * 256 * 3))
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "report.html")
+            gen = ReportGenerator(output_path)
+            mime, data = gen._encode_pil(img)
+            self.assertGreater(len(data), report_generator._B64_CHUNK)
+            gen.generate([{'type': 'click', 'button': 'BTN_LEFT', 'x': 1, 'y': 2,
+                           'time': 1600000000, 'screenshot': img}])
+
+            with open(output_path, "r") as f:
+                content = f.read()
+            self.assertIn(f'src="data:{mime};base64,{base64.b64encode(data).decode()}"', content)
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,19 +3,40 @@ from unittest.mock import MagicMock, patch
 from PIL import Image
 from wsr.screenshot_engine import ScreenshotEngine
 import io
+import os
 
 class TestScreenshotEngine(unittest.TestCase):
     def setUp(self):
-        # Prevent auto-detection during init if needed, or just mock subprocess
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout=b'grim -h')
-            self.engine = ScreenshotEngine()
+        self.engine = ScreenshotEngine(backend="grim")
 
     def test_create_default_cursor(self):
         cursor = self.engine._create_default_cursor()
         self.assertIsInstance(cursor, Image.Image)
         self.assertEqual(cursor.size, (24, 24))
 
+    def test_cursor_icon_shared_between_engines(self):
+        other = ScreenshotEngine(backend="grim")
+        self.assertIs(other.cursor_icon, self.engine.cursor_icon)
+
+    def test_backend_detected_via_path_once(self):
+        self.addCleanup(setattr, ScreenshotEngine, "_DETECTED_BACKEND",
+                        ScreenshotEngine._DETECTED_BACKEND)
+        ScreenshotEngine._DETECTED_BACKEND = None
+        with patch('wsr.screenshot_engine.shutil.which',
+                   side_effect=lambda name: "/usr/bin/grim" if name == "grim" else None) as which, \
+                patch('subprocess.run') as mock_run:
+            first = ScreenshotEngine()
+            second = ScreenshotEngine()
+        self.assertEqual((first.backend, second.backend), ("grim", "grim"))
+        self.assertEqual(which.call_count, 1)
+        mock_run.assert_not_called()
+
+    def test_explicit_backend_skips_detection(self):
+        with patch.object(ScreenshotEngine, "_detect_backend") as detect:
+            engine = ScreenshotEngine(backend="gnome-screenshot")
+        self.assertEqual(engine.backend, "gnome-screenshot")
+        detect.assert_not_called()
+
     @patch('subprocess.run')
     def test_capture_grim(self, mock_run):
         self.engine.backend = "grim"
@@ -30,6 +51,27 @@ class TestScreenshotEngine(unittest.TestCase):
         self.assertIsInstance(captured, Image.Image)
         self.assertEqual(captured.size, (100, 100))
 
+    @patch('subprocess.run')
+    def test_capture_grim_requests_raw_ppm(self, mock_run):
+        self.engine.backend = "grim"
+        img_byte_arr = io.BytesIO()
+        Image.new("RGB", (64, 32), "red").save(img_byte_arr, format='PPM')
+        mock_run.return_value = MagicMock(stdout=img_byte_arr.getvalue())
+
+        captured = self.engine.capture("DP-1")
+
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd, ["grim", "-t", "ppm", "-o", "DP-1", "-"])
+        self.assertEqual(captured.mode, "RGB")
+        self.assertEqual(captured.size, (64, 32))
+        self.assertEqual(captured.getpixel((63, 31)), (255, 0, 0))
+
+    @patch('subprocess.run')
+    def test_capture_grim_truncated_ppm(self, mock_run):
+        self.engine.backend = "grim"
+        mock_run.return_value = MagicMock(stdout=b"P6\n4 4\n255\n" + b"\x00" * 10)
+        self.assertIsNone(self.engine.capture())
+
     def test_add_cursor(self):
         img = Image.new("RGB", (100, 100), "blue")
         result = self.engine.add_cursor(img, 50, 50)
@@ -38,5 +80,110 @@ class TestScreenshotEngine(unittest.TestCase):
         # Check if it's RGBA now
         self.assertEqual(result.mode, "RGBA")
 
+    def test_add_cursor_leaves_input_untouched(self):
+        img = Image.new("RGBA", (100, 100), "blue")
+        result = self.engine.add_cursor(img, 0, 0)
+        self.assertIsNot(result, img)
+        self.assertEqual(img.getpixel((1, 1)), (0, 0, 255, 255))
+        self.assertNotEqual(result.getpixel((1, 1)), (0, 0, 255, 255))
+
+    def test_add_cursor_inplace_matches_copying_overlay(self):
+        img = Image.new("RGB", (100, 100), "blue")
+        expected = self.engine.add_cursor(img, 10, 10).convert("RGB")
+        result = self.engine.add_cursor_inplace(img, 10, 10)
+        self.assertIs(result, img)
+        self.assertEqual(result.mode, "RGB")
+        for pos in [(10, 10), (12, 15), (20, 30), (50, 50)]:
+            for got, want in zip(result.getpixel(pos), expected.getpixel(pos)):
+                self.assertLessEqual(abs(got - want), 1)
+
+    def test_add_cursor_inplace_converts_other_modes(self):
+        img = Image.new("L", (50, 50), 128)
+        result = self.engine.add_cursor_inplace(img, 0, 0)
+        self.assertEqual(result.mode, "RGBA")
+        self.assertEqual(img.mode, "L")
+
+    def test_palettize_flat_content(self):
+        img = Image.new("RGB", (640, 360), "white")
+        img.paste((200, 30, 30), (100, 100, 300, 200))
+        result = self.engine._palettize(img)
+        self.assertEqual(result.mode, "P")
+        # Few colours: exact palette, pixel-identical round-trip
+        self.assertEqual(result.convert("RGB").tobytes(), img.tobytes())
+
+    def test_palettize_skips_frame_without_exact_palette(self):
+        # The sample looks flat, but the frame has more than 256 colours
+        img = Image.new("RGB", (640, 360), "white")
+        for i in range(300):
+            img.putpixel((i, 0), (i % 256, i // 256, 7))
+        sample = Image.new("RGB", (320, 180), "white")
+        self.assertIsNone(self.engine._palettize(img, sample))
+
+    def test_palettize_skips_colour_rich_content(self):
+        img = Image.frombytes("RGB", (640, 360), os.urandom(640 * 360 * 3))
+        self.assertIsNone(self.engine._palettize(img))
+
+    def test_compressed_capture_quantizes_only_when_enabled(self):
+        img = Image.new("RGB", (640, 360), "white")
+        self.engine.capture = MagicMock(side_effect=lambda *_: img.copy())
+
+        plain, mime = self.engine.capture_with_cursor_compressed(10, 10, format="png")
+        self.engine.quantize = True
+        lossless, mime_q = self.engine.capture_with_cursor_compressed(10, 10, format="png")
+
+        self.assertEqual((mime, mime_q), ("image/png", "image/png"))
+        decoded = Image.open(io.BytesIO(lossless))
+        self.assertEqual(decoded.mode, "P")
+        decoded = decoded.convert("RGB")
+        self.assertEqual(decoded.getpixel((300, 300)), (255, 255, 255))
+        self.assertNotEqual(plain, lossless)
+
+    def test_compressed_jpeg_skips_colour_sample(self):
+        img = Image.new("RGB", (640, 360), "white")
+        self.engine.capture = MagicMock(side_effect=lambda *_: img.copy())
+        self.engine.quantize = True
+
+        with patch.object(ScreenshotEngine, "_sample") as sample:
+            _, mime = self.engine.capture_with_cursor_compressed(10, 10, format="jpg")
+
+        self.assertEqual(mime, "image/jpeg")
+        sample.assert_not_called()
+
+    def test_compressed_webp_uses_quality_by_default(self):
+        img = Image.new("RGB", (640, 360), (250, 250, 250))
+        img.paste((30, 30, 30), (100, 100, 300, 120))
+        self.engine.capture = MagicMock(side_effect=lambda *_: img.copy())
+
+        with patch.object(Image.Image, "save", autospec=True) as save:
+            self.engine.capture_with_cursor_compressed(500, 300, format="webp", quality=70)
+
+        self.assertEqual(save.call_args.kwargs, {"format": "WEBP", "quality": 70})
+
+    def test_compressed_webp_lossless_for_screen_content_with_quantize(self):
+        # 640 distinct colours: too many for a palette, few enough for screen content
+        img = Image.new("RGB", (640, 360), (250, 250, 250))
+        for x in range(640):
+            img.paste((x % 256, x // 256, 90), (x, 0, x + 1, 40))
+        self.engine.capture = MagicMock(side_effect=lambda *_: img.copy())
+        self.engine.quantize = True
+
+        data, mime = self.engine.capture_with_cursor_compressed(500, 300, format="webp")
+
+        self.assertEqual(mime, "image/webp")
+        decoded = Image.open(io.BytesIO(data))
+        self.assertEqual(decoded.mode, "RGB")
+        expected = self.engine.add_cursor(img, 500, 300).convert("RGB")
+        self.assertEqual(decoded.tobytes(), expected.tobytes())
+
+    def test_compressed_webp_lossy_for_photo_content(self):
+        img = Image.frombytes("RGB", (640, 360), os.urandom(640 * 360 * 3))
+        self.engine.capture = MagicMock(side_effect=lambda *_: img.copy())
+        self.engine.quantize = True
+
+        with patch.object(Image.Image, "save", autospec=True) as save:
+            self.engine.capture_with_cursor_compressed(500, 300, format="webp", quality=70)
+
+        self.assertEqual(save.call_args.kwargs, {"format": "WEBP", "quality": 70})
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,8 +2,8 @@
 Tests for the ScreenshotWorker async screenshot processing.
 """
 
+import threading
 import unittest
-import time
 from unittest.mock import MagicMock, patch
 from concurrent.futures import ThreadPoolExecutor
 
@@ -75,27 +75,28 @@ class TestScreenshotWorker(unittest.TestCase):
     
     def test_pending_count(self):
         """pending_count() tracks incomplete futures."""
-        # Use slow mock to keep futures pending
-        def slow_capture(*args, **kwargs):
-            time.sleep(0.5)
+        # Hold captures until released to keep futures pending
+        release = threading.Event()
+
+        def blocked_capture(*args, **kwargs):
+            release.wait(2.0)
             return (b"bytes", "image/png")
-        
-        self.mock_engine.capture_with_cursor_compressed.side_effect = slow_capture
+
+        self.mock_engine.capture_with_cursor_compressed.side_effect = blocked_capture
         worker = ScreenshotWorker(self.mock_engine, max_workers=1)
         self.worker = worker
-        
+
         event1 = {'type': 'click'}
         event2 = {'type': 'click'}
-        
+
         worker.request_screenshot(event1, "eDP-1", 0, 0)
         worker.request_screenshot(event2, "eDP-1", 0, 0)
-        
-        # Should have 2 pending (or 1 if first already started)
-        pending = worker.pending_count()
-        self.assertGreaterEqual(pending, 1)
-        self.assertLessEqual(pending, 2)
-        
-        # Wait and check again
+
+        # First one running, second queued: both pending
+        self.assertEqual(worker.pending_count(), 2)
+
+        # Release and check again
+        release.set()
         worker.wait_for_pending(timeout=3.0)
         self.assertEqual(worker.pending_count(), 0)
     
@@ -114,6 +115,36 @@ class TestScreenshotWorker(unittest.TestCase):
         self.assertEqual(completed, 3)
         self.assertEqual(len(worker.futures), 0)
     
+    def test_wait_for_event_waits_for_that_screenshot_only(self):
+        """wait_for_event() blocks until the given event has its screenshot."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def capture(*args, **kwargs):
+            calls.append(None)
+            if len(calls) > 1:
+                # Second capture stays in flight until released
+                release.wait(2.0)
+            return (b"bytes", "image/png")
+
+        self.mock_engine.capture_with_cursor_compressed.side_effect = capture
+        worker = ScreenshotWorker(self.mock_engine, max_workers=1)
+        self.worker = worker
+
+        first, second = {'type': 'click'}, {'type': 'click'}
+        worker.request_screenshot(first, "eDP-1", 0, 0)
+        worker.request_screenshot(second, "eDP-1", 0, 0)
+
+        worker.wait_for_event(first, timeout=2.0)
+        self.assertEqual(first['screenshot_bytes'], b"bytes")
+        self.assertNotIn('screenshot_bytes', second)
+        release.set()
+
+        # Unknown or already awaited events return immediately
+        worker.wait_for_event({'type': 'key'})
+        worker.wait_for_event(first)
+
     def test_shutdown_prevents_new_requests(self):
         """After shutdown(), new requests are ignored."""
         worker = ScreenshotWorker(self.mock_engine, max_workers=1)
@@ -166,29 +197,26 @@ class TestScreenshotWorker(unittest.TestCase):
     
     def test_multiple_parallel_captures(self):
         """Multiple screenshots can be processed in parallel."""
-        capture_times = []
-        
-        def timed_capture(*args, **kwargs):
-            start = time.time()
-            time.sleep(0.2)
-            capture_times.append(time.time() - start)
+        # Both captures must be in flight at once to pass the barrier; a
+        # serialized pool would break it after the timeout.
+        barrier = threading.Barrier(2, timeout=1.0)
+
+        def rendezvous_capture(*args, **kwargs):
+            barrier.wait()
             return (b"bytes", "image/png")
-        
-        self.mock_engine.capture_with_cursor_compressed.side_effect = timed_capture
+
+        self.mock_engine.capture_with_cursor_compressed.side_effect = rendezvous_capture
         worker = ScreenshotWorker(self.mock_engine, max_workers=2)
         self.worker = worker
-        
-        # Queue 2 screenshots
-        start = time.time()
-        worker.request_screenshot({'type': 'click'}, "eDP-1", 0, 0)
-        worker.request_screenshot({'type': 'click'}, "eDP-1", 0, 0)
-        
+
+        events = [{'type': 'click'}, {'type': 'click'}]
+        for event in events:
+            worker.request_screenshot(event, "eDP-1", 0, 0)
+
         worker.wait_for_pending(timeout=2.0)
-        total_time = time.time() - start
-        
-        # With 2 workers, 2 x 0.2s tasks should complete in ~0.2s, not 0.4s
-        # Allow some slack for thread overhead
-        self.assertLess(total_time, 0.5)
+
+        self.assertFalse(barrier.broken)
+        self.assertEqual([e.get('screenshot_bytes') for e in events], [b"bytes", b"bytes"])
 
 
 class TestScreenshotWorkerNoneResult(unittest.TestCase):
@@ -0,0 +1,180 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from wsr import main as wsr_main
+from wsr import waybar_module
+
+
+class TestStateWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.state_file = os.path.join(self.tmpdir.name, "wsr_state.json")
+        patcher = patch.object(waybar_module, "STATE_FILE", self.state_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _watch(self):
+        fd = waybar_module._inotify_watch(self.tmpdir.name)
+        if fd is None:
+            self.skipTest("inotify not available")
+        self.addCleanup(os.close, fd)
+        return fd
+
+    def test_state_file_changes_are_detected(self):
+        fd = self._watch()
+        self.assertFalse(waybar_module._state_file_changed(fd))
+
+        # Atomic write as done by main.write_state
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"state": "recording", "pid": os.getpid()}, f)
+        os.rename(tmp, self.state_file)
+        self.assertTrue(waybar_module._state_file_changed(fd))
+
+        os.unlink(self.state_file)
+        self.assertTrue(waybar_module._state_file_changed(fd))
+
+    def test_unrelated_files_are_ignored(self):
+        fd = self._watch()
+        with open(os.path.join(self.tmpdir.name, "other.txt"), "w") as f:
+            f.write("x")
+        self.assertFalse(waybar_module._state_file_changed(fd))
+
+    def test_watch_prints_initial_status(self):
+        out = io.StringIO()
+        # Stop after the first line by simulating Waybar going away
+        with patch("sys.stdout", out), \
+                patch.object(waybar_module, "_inotify_watch", return_value=None), \
+                patch.object(waybar_module.time, "sleep", side_effect=KeyboardInterrupt):
+            waybar_module.watch_status()
+        self.assertEqual(json.loads(out.getvalue())["alt"], "idle")
+
+    def test_main_without_arguments_prints_status(self):
+        out = io.StringIO()
+        with patch("sys.stdout", out), patch("sys.argv", ["wsr-waybar"]):
+            waybar_module.main()
+        self.assertEqual(json.loads(out.getvalue())["alt"], "idle")
+
+
+class TestReadState(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.state_file = os.path.join(self.tmpdir.name, "wsr_state.json")
+        patcher = patch.object(waybar_module, "STATE_FILE", self.state_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_state(self):
+        with open(self.state_file, "w") as f:
+            json.dump({"state": "countdown", "pid": 42, "remaining": 3}, f)
+        self.assertEqual(waybar_module.read_state(), {"state": "countdown", "pid": 42, "remaining": 3})
+
+    def test_unchanged_file_is_not_reparsed(self):
+        patcher = patch.object(waybar_module, "_state_cache", (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        state = {"state": "recording", "pid": os.getpid()}
+        with open(self.state_file, "w") as f:
+            json.dump(state, f)
+
+        with patch.object(waybar_module, "read_state", wraps=waybar_module.read_state) as read:
+            self.assertEqual(waybar_module.is_wsr_running(), (True, state))
+            self.assertEqual(waybar_module.is_wsr_running(), (True, state))
+            self.assertEqual(read.call_count, 1)
+
+            # Atomic replace as done by main.write_state
+            tmp = self.state_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"state": "countdown", "pid": os.getpid()}, f)
+            os.rename(tmp, self.state_file)
+            self.assertEqual(waybar_module.is_wsr_running()[1]["state"], "countdown")
+            self.assertEqual(read.call_count, 2)
+
+    def test_missing_or_broken_file(self):
+        self.assertIsNone(waybar_module.read_state())
+        with open(self.state_file, "w") as f:
+            f.write('{"state": "rec')
+        self.assertIsNone(waybar_module.read_state())
+
+
+class TestPidCheck(unittest.TestCase):
+    def test_proc_start_time_of_own_process(self):
+        start = waybar_module.proc_start_time(os.getpid())
+        if start is None:
+            self.skipTest("/proc not available")
+        self.assertEqual(waybar_module.proc_start_time("self"), start)
+        self.assertEqual(wsr_main._own_start_time(), start)
+
+    def test_matching_start_time_is_alive(self):
+        start = waybar_module.proc_start_time(os.getpid())
+        self.assertTrue(waybar_module.is_pid_alive(os.getpid(), start))
+
+    def test_reused_pid_is_not_alive(self):
+        start = waybar_module.proc_start_time(os.getpid())
+        if start is None:
+            self.skipTest("/proc not available")
+        self.assertFalse(waybar_module.is_pid_alive(os.getpid(), start + 1))
+
+    def test_unreadable_proc_falls_back_to_kill(self):
+        with patch.object(waybar_module, "proc_start_time", return_value=None):
+            self.assertTrue(waybar_module.is_pid_alive(os.getpid(), 12345))
+
+
+class TestStopWsr(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.state_file = os.path.join(self.tmpdir.name, "wsr_state.json")
+        with open(self.state_file, "w") as f:
+            f.write("{}")
+        patcher = patch.object(waybar_module, "STATE_FILE", self.state_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_signals_through_pidfd(self):
+        start = waybar_module.proc_start_time(os.getpid())
+        with patch.object(waybar_module.signal, "pidfd_send_signal") as send:
+            waybar_module.stop_wsr(os.getpid(), start)
+        send.assert_called_once()
+        self.assertEqual(send.call_args.args[1], waybar_module.signal.SIGINT)
+
+    def test_reused_pid_is_not_signalled(self):
+        start = waybar_module.proc_start_time(os.getpid())
+        if start is None:
+            self.skipTest("/proc not available")
+        with patch.object(waybar_module.signal, "pidfd_send_signal") as send, \
+                patch.object(waybar_module.os, "kill") as kill:
+            waybar_module.stop_wsr(os.getpid(), start + 1)
+        send.assert_not_called()
+        kill.assert_not_called()
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_permission_error_falls_back_to_sudo(self):
+        with patch.object(waybar_module.signal, "pidfd_send_signal", side_effect=PermissionError), \
+                patch("subprocess.run") as run:
+            waybar_module.stop_wsr(os.getpid())
+        self.assertEqual(run.call_args.args[0], ["sudo", "-n", "kill", "-INT", str(os.getpid())])
+
+    def test_start_passes_current_language(self):
+        os.unlink(self.state_file)
+        waybar_module.init_i18n("de")
+        self.addCleanup(waybar_module.init_i18n, None)
+        with patch("subprocess.Popen") as popen:
+            waybar_module.toggle_wsr()
+        cmd = popen.call_args.args[0]
+        self.assertEqual(cmd[cmd.index("--lang") + 1], "de")
+
+    def test_gone_process_removes_state(self):
+        with patch.object(waybar_module.os, "pidfd_open", side_effect=ProcessLookupError):
+            waybar_module.stop_wsr(12345)
+        self.assertFalse(os.path.exists(self.state_file))
+
+
+if __name__ == '__main__':
+    unittest.main()